@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Callable, Dict, List
 
 import openpyxl
-from PyQt6.QtCore import Qt, QMetaObject, Q_ARG, pyqtSlot
+from PyQt6.QtCore import (
+    QAbstractListModel,
+    QMetaObject,
+    QModelIndex,
+    QObject,
+    QSortFilterProxyModel,
+    Qt,
+    QTimer,
+    Q_ARG,
+    pyqtSlot,
+)
 from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import (
     QApplication,
     QCheckBox,
+    QComboBox,
     QDialog,
     QDoubleSpinBox,
     QFileDialog,
@@ -21,7 +33,7 @@ from PyQt6.QtWidgets import (
     QMainWindow,
     QMessageBox,
     QPushButton,
-    QListWidget,
+    QListView,
     QScrollArea,
     QTabWidget,
     QTextEdit,
@@ -31,7 +43,9 @@ from PyQt6.QtWidgets import (
 from lenexpy import tofile
 
 from reg.main import TranslatorLenex
-from reg.issues import IssueCollector
+from reg.stats import RunStats
+from reg.issue_groups import IssueGroups, format_ranges
+from reg.issues import IssueCollector, get_issue_collector
 
 
 def _muted_label(text: str) -> QLabel:
@@ -41,6 +55,99 @@ def _muted_label(text: str) -> QLabel:
     return label
 
 
+class IssueListModel(QAbstractListModel):
+    """Issues of one category, read from the collector a page at a time.
+
+    Only the pages the view asks for are loaded and only the most recent
+    ones are kept, so the model costs the same for a hundred issues or a
+    hundred thousand spilled to disk.
+    """
+
+    IssueRole = Qt.ItemDataRole.UserRole
+    page_size = 1000
+    max_pages = 20
+
+    def __init__(self, collector: IssueCollector, category: str, parent: QObject | None = None):
+        super().__init__(parent)
+        self.collector = collector
+        self.category = category
+        self.total = collector.count(category)
+        self.pages: OrderedDict[int, list] = OrderedDict()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.total
+
+    def issue(self, row: int):
+        number, offset = divmod(row, self.page_size)
+        page = self.pages.get(number)
+        if page is None:
+            page = self.pages[number] = self.collector.page(
+                self.category, number * self.page_size, self.page_size)
+            if len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(number)
+        return page[offset] if offset < len(page) else None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, self.IssueRole):
+            return None
+        issue = self.issue(index.row())
+        if issue is None or role == self.IssueRole:
+            return issue
+        prefix = f"Строка {issue.row_index}: " if issue.row_index else ""
+        return prefix + issue.message
+
+
+class IssueFilterModel(QSortFilterProxyModel):
+    """Text (case-insensitive, in the message) and level filter over an
+    IssueListModel. With no filter set rows are accepted without loading."""
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self.text = ""
+        self.level: str | None = None
+
+    def set_filter(self, text: str, level: str | None):
+        text = text.strip().casefold()
+        if (text, level) == (self.text, self.level):
+            return
+        self.text, self.level = text, level
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self.text and self.level is None:
+            return True
+        issue = self.sourceModel().issue(source_row)
+        if issue is None or (self.level is not None and issue.level != self.level):
+            return False
+        return self.text in issue.message.casefold()
+
+
+class IssueGroupModel(QAbstractListModel):
+    """Issue groups, largest first."""
+
+    GroupRole = Qt.ItemDataRole.UserRole
+
+    def __init__(self, groups: IssueGroups, parent: QObject | None = None):
+        super().__init__(parent)
+        self.groups = groups.largest()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.groups)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        group = self.groups[index.row()]
+        if role == self.GroupRole:
+            return group
+        if role == Qt.ItemDataRole.DisplayRole:
+            label = IssuesDialog.CATEGORY_LABELS.get(group.category, group.category)
+            return f"{group.count} × [{label}] {group.label}"
+        return None
+
+
 class IssuesDialog(QDialog):
     CATEGORY_LABELS = {
         "points_policy": "Политика очков",
@@ -48,67 +155,144 @@ class IssuesDialog(QDialog):
         "age_exh": "Возраст/EXH",
         "duplicate_entry": "Дубликаты",
         "parse_error": "Ошибки строк",
+        "athlete_merged": "Объединённые спортсмены",
+    }
+    LEVELS = {
+        "Все уровни": None,
+        "Ошибки": "error",
+        "Предупреждения": "warning",
     }
 
     def __init__(self, collector: IssueCollector, parent: QWidget | None = None):
         super().__init__(parent)
         self.setWindowTitle("Отчет об обработке")
         self.resize(720, 480)
+        self.filters: dict[QWidget, IssueFilterModel] = {}
 
         layout = QVBoxLayout(self)
-        grouped = collector.by_category()
-        if not grouped:
+        categories = collector.categories()
+        if not categories:
             layout.addWidget(QLabel("Замечаний нет."))
         else:
-            tabs = QTabWidget()
-            for cat, items in grouped.items():
+            filter_row = QHBoxLayout()
+            self.search = QLineEdit()
+            self.search.setPlaceholderText("Поиск по тексту замечания")
+            self.search.setClearButtonEnabled(True)
+            self.level = QComboBox()
+            self.level.addItems(self.LEVELS)
+            filter_row.addWidget(self.search, 1)
+            filter_row.addWidget(self.level)
+            layout.addLayout(filter_row)
+
+            # Filter once typing pauses rather than on every keystroke
+            self.filter_timer = QTimer(self)
+            self.filter_timer.setSingleShot(True)
+            self.filter_timer.setInterval(200)
+            self.filter_timer.timeout.connect(self._apply_filter)
+            self.search.textChanged.connect(self.filter_timer.start)
+            self.level.currentIndexChanged.connect(self._apply_filter)
+
+            self.tabs = QTabWidget()
+            self.tabs.addTab(self._summary_tab(collector), f"Сводка ({len(collector.groups)})")
+            for cat, count in categories.items():
                 tab = QWidget()
                 tab_layout = QVBoxLayout(tab)
-                list_widget = QListWidget()
+                model = IssueListModel(collector, cat, tab)
+                proxy = IssueFilterModel(tab)
+                proxy.setSourceModel(model)
+                self.filters[tab] = proxy
+
+                view = QListView()
+                view.setUniformItemSizes(True)
+                view.setFont(QFont("Segoe UI", 10))
+                view.setModel(proxy)
                 detail = QTextEdit()
                 detail.setReadOnly(True)
                 detail.setFont(QFont("Consolas", 10))
-                list_widget.setFont(QFont("Segoe UI", 10))
-
-                for issue in items:
-                    prefix = f"Строка {issue['row_index']}: " if issue["row_index"] else ""
-                    list_widget.addItem(prefix + issue["message"])
-
-                def on_select(index: int, issues=items, detail_widget=detail):
-                    if index < 0 or index >= len(issues):
-                        detail_widget.clear()
-                        return
-                    issue = issues[index]
-                    parts = []
-                    if issue.get("row_data"):
-                        parts.append("Данные строки:")
-                        for key, value in issue["row_data"].items():
-                            parts.append(f"  - {key}: {value}")
-                    elif issue.get("row_repr"):
-                        parts.append(f"Row: {issue['row_repr']}")
-                    if issue.get("extra"):
-                        for k, v in issue["extra"].items():
-                            parts.append(f"{k}: {v}")
-                    detail_widget.setPlainText("\n".join(parts))
-
-                list_widget.currentRowChanged.connect(on_select)
-                if items:
-                    list_widget.setCurrentRow(0)
-
-                tab_layout.addWidget(list_widget)
+
+                view.selectionModel().currentChanged.connect(
+                    lambda current, _previous, detail_widget=detail:
+                        self._show_issue(current, detail_widget))
+                if proxy.rowCount():
+                    view.setCurrentIndex(proxy.index(0, 0))
+
+                tab_layout.addWidget(view)
                 tab_layout.addWidget(detail)
-                tabs.addTab(tab, self.CATEGORY_LABELS.get(cat, cat))
+                label = self.CATEGORY_LABELS.get(cat, cat)
+                self.tabs.addTab(tab, f"{label} ({count})")
 
-            layout.addWidget(tabs)
+            # Only the visible tab is filtered; others catch up when shown
+            self.tabs.currentChanged.connect(self._apply_filter)
+            layout.addWidget(self.tabs)
 
         btn_close = QPushButton("Закрыть")
         btn_close.clicked.connect(self.accept)
         layout.addWidget(btn_close, alignment=Qt.AlignmentFlag.AlignRight)
 
+    def _summary_tab(self, collector: IssueCollector) -> QWidget:
+        tab = QWidget()
+        tab_layout = QVBoxLayout(tab)
+        view = QListView()
+        view.setUniformItemSizes(True)
+        view.setFont(QFont("Segoe UI", 10))
+        view.setModel(IssueGroupModel(collector.groups, tab))
+        detail = QTextEdit()
+        detail.setReadOnly(True)
+        detail.setFont(QFont("Consolas", 10))
+        view.selectionModel().currentChanged.connect(
+            lambda current, _previous: self._show_group(current, detail))
+        if view.model().rowCount():
+            view.setCurrentIndex(view.model().index(0, 0))
+        tab_layout.addWidget(view)
+        tab_layout.addWidget(detail)
+        return tab
+
+    def _apply_filter(self):
+        proxy = self.filters.get(self.tabs.currentWidget())
+        if proxy is not None:
+            proxy.set_filter(self.search.text(), self.LEVELS[self.level.currentText()])
+
+    @classmethod
+    def _show_group(cls, current: QModelIndex, detail_widget: QTextEdit):
+        group = current.data(IssueGroupModel.GroupRole) if current.isValid() else None
+        if group is None:
+            detail_widget.clear()
+            return
+        parts = [
+            f"Категория: {cls.CATEGORY_LABELS.get(group.category, group.category)}",
+            f"Уровень: {group.level}",
+            f"Количество: {group.count}",
+            f"Сообщение: {group.label}",
+        ]
+        for k, v in group.key.items():
+            parts.append(f"{k}: {v}")
+        if group.ranges:
+            parts.append(f"Строки: {format_ranges(group.ranges, 100)}")
+        detail_widget.setPlainText("\n".join(parts))
+
+    @staticmethod
+    def _show_issue(current: QModelIndex, detail_widget: QTextEdit):
+        issue = current.data(IssueListModel.IssueRole) if current.isValid() else None
+        if issue is None:
+            detail_widget.clear()
+            return
+        parts = []
+        if issue.row_data:
+            parts.append("Данные строки:")
+            for key, value in issue.row_data.items():
+                parts.append(f"  - {key}: {value}")
+        elif issue.row_repr:
+            parts.append(f"Row: {issue.row_repr}")
+        if issue.extra:
+            for k, v in issue.extra.items():
+                parts.append(f"{k}: {v}")
+        detail_widget.setPlainText("\n".join(parts))
+
 
 class ProcessTab(QWidget):
-    def __init__(self, on_start: Callable[[], None]):
+    def __init__(self, data: dict, on_start: Callable[[], None]):
         super().__init__()
+        self.data = data
         self._ready = False
         self._busy = False
         self.on_start = on_start
@@ -139,14 +323,22 @@ class ProcessTab(QWidget):
         self.button_start.setMinimumHeight(34)
         self.button_start.clicked.connect(self.on_start)
 
+        self.profile = QCheckBox("Профилировать (профиль сохраняется рядом с LXF)")
+        self.profile.setChecked(bool(self.data.get("profile")))
+        self.profile.stateChanged.connect(self.toggle_profile)
+
         card_layout.addWidget(title)
         card_layout.addWidget(subtitle)
         card_layout.addWidget(steps)
         card_layout.addStretch(1)
+        card_layout.addWidget(self.profile)
         card_layout.addWidget(self.button_start)
         layout.addWidget(card)
         layout.addStretch(1)
 
+    def toggle_profile(self):
+        self.data["profile"] = self.profile.isChecked()
+
     def _sync_state(self):
         self.button_start.setEnabled(self._ready and not self._busy)
 
@@ -165,11 +357,13 @@ class FilesTab(QWidget):
         data: dict,
         on_files_changed: Callable[[], None],
         on_auto_location: Callable[[str], None],
+        on_saved: Callable[[str], None] | None = None,
     ):
         super().__init__()
         self.data = data
         self.on_files_changed = on_files_changed
         self.on_auto_location = on_auto_location
+        self.on_saved = on_saved
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(14, 12, 14, 12)
@@ -279,6 +473,8 @@ class FilesTab(QWidget):
         if not file:
             return
         tofile(self.data["lenex"], file)
+        if self.on_saved:
+            self.on_saved(file)
         self.btn_save.setEnabled(False)
         QMessageBox.information(self, "Готово", "Файл успешно сохранён.")
 
@@ -584,6 +780,7 @@ class App(QMainWindow):
         self.data = data
         self.worker: threading.Thread | None = None
         self.issue_collector: IssueCollector | None = None
+        self.translator: TranslatorLenex | None = None
 
         self.setWindowTitle("Lenex Converter")
         self.resize(880, 760)
@@ -599,12 +796,18 @@ class App(QMainWindow):
         main_layout.addWidget(self.banner)
 
         self.header_tabs = QTabWidget()
-        self.process_tab = ProcessTab(self.handle_start)
+        self.process_tab = ProcessTab(self.data, self.handle_start)
         self.files_tab = FilesTab(
-            self.data, on_files_changed=self.refresh_start_state, on_auto_location=self.init_auto_location
+            self.data, on_files_changed=self.refresh_start_state, on_auto_location=self.init_auto_location,
+            on_saved=self._on_saved,
         )
         self.points_tab = PointsTab(
-            self.data, on_change=self._update_status_badges)
+            self.data, on_change=self._on_points_changed)
+        # Re-apply once the spin boxes settle, not on every keystroke
+        self.points_timer = QTimer(self)
+        self.points_timer.setSingleShot(True)
+        self.points_timer.setInterval(300)
+        self.points_timer.timeout.connect(self._reapply_points)
         self.birthday_tab = BirthdayTab(self.data)
 
         self.header_tabs.addTab(self.process_tab, "Процесс")
@@ -643,7 +846,10 @@ class App(QMainWindow):
         self.lxf_badge = QLabel("LXF/LEF: не выбран")
         self.xlsx_badge = QLabel("XLSX: не выбран")
         self.points_badge = QLabel("")
-        for badge in (self.lxf_badge, self.xlsx_badge, self.points_badge):
+        # Timings of the last run, details in the tooltip
+        self.stats_badge = QLabel("")
+        self.stats_badge.setVisible(False)
+        for badge in (self.lxf_badge, self.xlsx_badge, self.points_badge, self.stats_badge):
             badge.setProperty("role", "chip")
             badge_row.addWidget(badge)
         badge_row.addStretch(1)
@@ -676,6 +882,35 @@ class App(QMainWindow):
         self.xlsx_badge.setToolTip(xlsx or "")
         self.points_badge.setText(self._format_points_badge())
 
+    def _show_stats(self, stats: RunStats):
+        self.stats_badge.setText(f"Последний запуск: {stats.banner()}")
+        self.stats_badge.setToolTip(stats.details())
+        self.stats_badge.setVisible(True)
+
+    def _on_saved(self, file: str):
+        if self.translator is not None and self.translator.profiler is not None:
+            self.translator.profiler.save(file)
+
+    def _on_points_changed(self):
+        self._update_status_badges()
+        if self.translator is not None and self.worker is None:
+            self.points_timer.start()
+
+    def _reapply_points(self):
+        # Only the threshold check depends on these settings, so the last
+        # result can be patched in place instead of re-running everything.
+        if self.translator is None or self.worker is not None:
+            return
+        if self.translator.reapply_points():
+            self.files_tab.set_save_enabled(True)
+            return
+        # The last result no longer matches the settings: don't save it
+        self.translator = None
+        self.files_tab.set_save_enabled(False)
+        self.stats_badge.setText("Настройки очков изменены: нужен новый запуск")
+        self.stats_badge.setToolTip("")
+        self.stats_badge.setVisible(True)
+
     def refresh_start_state(self):
         ready = bool(self.data.get("lxf")) and bool(self.data.get("xlsx"))
         self.process_tab.set_ready(ready)
@@ -709,7 +944,8 @@ class App(QMainWindow):
     def handle_start(self):
         if self.worker is not None:
             return
-        self.issue_collector = IssueCollector()
+        self.issue_collector = get_issue_collector(self.data)
+        self.translator = None
         self.process_tab.set_busy(True)
         self.primary_start_button.setEnabled(False)
         self.worker = threading.Thread(
@@ -722,6 +958,7 @@ class App(QMainWindow):
                 self.data["lxf"], self.data["xlsx"], self.data, collector=self.issue_collector)
             lenex = translator.parse()
             self.data["lenex"] = lenex
+            self.translator = translator
         except Exception as exc:  # noqa: BLE001
             QMetaObject.invokeMethod(
                 self,
@@ -742,6 +979,8 @@ class App(QMainWindow):
         self.process_tab.set_busy(False)
         self.primary_start_button.setEnabled(True)
         self.files_tab.set_save_enabled(True)
+        if self.translator is not None:
+            self._show_stats(self.translator.stats)
         QMessageBox.information(self, "Готово", "Обработка завершена.")
         if self.issue_collector:
             IssuesDialog(self.issue_collector, self).exec()
@@ -0,0 +1,112 @@
+"""Old regex parse_entrytime vs EntryTimeParser on mixed entry time cells.
+
+    python benchmarks/bench_entrytime.py [values]
+"""
+from contextlib import redirect_stdout
+from datetime import time, timedelta
+import gc
+import math
+import os
+from pathlib import Path
+import random
+import re
+import sys
+import time as clock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loguru import logger  # noqa: E402
+from reg.entrytime import EntryTimeParser  # noqa: E402
+
+
+def legacy(et, index):
+    """parse_entrytime as it was before reg/entrytime.py."""
+    if isinstance(et, float):
+        if math.isnan(et) or et <= 0:
+            return time()
+        minutes = int(et // 60)
+        seconds = int(et % 60)
+        microseconds = round((et - int(et)) * 1_000_000)
+
+        print(et)
+        print(time(0, minutes, seconds, microseconds))
+        return time(0, minutes, seconds, microseconds)
+    if isinstance(et, timedelta):
+        total_seconds = et.total_seconds()
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
+        seconds = total_seconds % 60
+        return time(00, int(hours), int(minutes), int(seconds))
+    if isinstance(et, time):
+        return time(0, et.hour, et.minute, et.microsecond)
+
+    et = et.strip()
+    if not et or et.lower() == 'nt':
+        return time()
+    match = re.fullmatch(
+        r'((?P<min>\d{1,2})[:\.,])?(?P<sec>\d{1,2})[:\.,](?P<hsec>\d{1,2})', et)
+    if not match:
+        logger.warning(f'[{index}]: Игнорирование времени из-за сбоя обработки ({et})')
+        return time()
+    try:
+        return time(
+            0,
+            int(match.group('min') or 0),
+            int(match.group('sec') or 0),
+            int(match.group('hsec') or 0) * 10_000
+        )
+    except Exception as err:
+        logger.warning(f'[{index}]: Игнорирование времени из-за сбоя обработки ({err};{et})')
+        return time()
+
+
+def sample(rng: random.Random):
+    kind = rng.random()
+    if kind < 0.6:
+        m, s, h = rng.randrange(10), rng.randrange(60), rng.randrange(100)
+        sep = rng.choice('.,:')
+        return rng.choice((f'{m}:{s:02}{sep}{h:02}', f'{s}{sep}{h:02}', f' {m}:{s:02}.{h} '))
+    if kind < 0.7:
+        return rng.choice(('', 'NT', 'nt', '  ', 'DNS', '1:75.00', '12-34'))
+    if kind < 0.85:
+        return round(rng.uniform(-1, 600), 2)
+    if kind < 0.95:
+        return time(rng.randrange(10), rng.randrange(60), 0, rng.randrange(100) * 10_000)
+    return timedelta(minutes=rng.randrange(10), seconds=rng.randrange(60))
+
+
+def main(count: int = 1_000_000):
+    rng = random.Random(0)
+    values = [sample(rng) for _ in range(count)]
+    logger.remove()
+    # Keep the collector from rescanning the inputs during the timed runs.
+    gc.freeze()
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        start = clock.perf_counter()
+        expected = [legacy(v, i) for i, v in enumerate(values)]
+        old = clock.perf_counter() - start
+
+    parser = EntryTimeParser()
+    start = clock.perf_counter()
+    per_value = [parser.parse(v, i) for i, v in enumerate(values)]
+    new = clock.perf_counter() - start
+
+    parser = EntryTimeParser()
+    start = clock.perf_counter()
+    column = parser.parse_column(values)
+    batch = clock.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(expected, per_value))
+    mismatches += sum(a != b for a, b in zip(expected, column))
+    print(f'values:       {count}')
+    print(f'regex (old):  {old * 1000:8.1f} ms  (stdout -> devnull)')
+    print(f'parse:        {new * 1000:8.1f} ms  (x{old / new:.1f})')
+    print(f'parse_column: {batch * 1000:8.1f} ms  (x{old / batch:.1f})')
+    print(f'mismatches:   {mismatches}')
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,115 @@
+"""Full TranslatorLenex.parse() on a sheet with 20% bad rows, logged the
+way start.py does in debug mode (DEBUG, diagnosed tracebacks, no rate
+limit) vs production mode (INFO, rate-limited per-row messages).
+
+    python benchmarks/bench_logging.py [rows]
+"""
+from datetime import datetime
+import json
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import openpyxl  # noqa: E402
+from lenexpy import tofile  # noqa: E402
+from lenexpy.models.agegroup import AgeGroup  # noqa: E402
+from lenexpy.models.constructor import Constructor  # noqa: E402
+from lenexpy.models.contact import Contact  # noqa: E402
+from lenexpy.models.event import Event  # noqa: E402
+from lenexpy.models.lenex import Lenex  # noqa: E402
+from lenexpy.models.meet import Meet  # noqa: E402
+from lenexpy.models.session import Session  # noqa: E402
+from lenexpy.models.swimstyle import SwimStyle  # noqa: E402
+from loguru import logger  # noqa: E402
+from reg.main import TranslatorLenex  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+STROKES = {'FREE': 'Вольный стиль', 'BACK': 'На спине', 'BREAST': 'Брасс', 'FLY': 'Баттерфляй'}
+LOG_FORMAT = '{time:YYYY-MM-DD HH:mm:ss.SSS zz} | {level: <8} | Line {line: >4} ({file}): {message}'
+
+
+def write_meet(path: Path):
+    events = []
+    for gender in ('M', 'F'):
+        for stroke in STROKES:
+            for distance in (50, 100, 200):
+                eventid = len(events) + 1
+                events.append(Event(
+                    eventid=eventid, number=eventid, gender=gender,
+                    swimstyle=SwimStyle(distance=distance, relaycount=1, stroke=stroke),
+                    agegroups=[AgeGroup(id=eventid, agemin=-1, agemax=-1)],
+                ))
+    meet = Meet(name='Benchmark', city='Town', nation='RUS', course='LCM', sessions=[
+        Session(date=datetime(2026, 5, 1), number=1, events=events)])
+    tofile(Lenex(
+        constructor=Constructor(name='bench', version='1', registration='bench',
+                                contact=Contact(email='bench@example.com')),
+        meet=meet, version='3.0',
+    ), str(path))
+
+
+def write_sheet(path: Path, rows: int, bad: float):
+    rng = random.Random(0)
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.append(['Фамилия', 'Имя', 'Отчество', 'Дата рождения', 'Пол', '', '', 'Клуб',
+                  'Разряд', 'Стиль плавания', 'Дистанция', '', 'Заявочное время', 'Категория'])
+    for i in range(rows):
+        k = rng.randrange(2000)
+        stroke = STROKES[rng.choice(list(STROKES))]
+        distance = rng.choice((50, 100, 200))
+        entrytime = f'{rng.randrange(3)}:{rng.randrange(60):02}.{rng.randrange(100):02}'
+        if rng.random() < bad:
+            # Unknown stroke, missing distance or unreadable time
+            kind = rng.randrange(3)
+            if kind == 0:
+                stroke = 'чепуха'
+            elif kind == 1:
+                distance = 400
+            else:
+                entrytime = 'garbage'
+        sheet.append([f'Фам{k}', f'Имя{k % 37}', f'Отч{k % 5}',
+                      f'{1 + k % 28:02}.{1 + k % 12:02}.{2008 + k % 10}',
+                      ('Мужской', 'Женский')[k % 2], None, None, f'Клуб {k % 13}', 'КМС',
+                      stroke, distance, None, entrytime, ''])
+    book.save(path)
+
+
+def run(directory: Path, config: dict, debug: bool) -> float:
+    logger.remove()
+    level = 'DEBUG' if debug else 'INFO'
+    sink = logger.add(directory / f'{level.lower()}.log', level=level, format=LOG_FORMAT,
+                      backtrace=debug, diagnose=debug)
+    config = dict(config, debug=debug)
+    start = time.perf_counter()
+    TranslatorLenex(str(directory / 'meet.lef'), str(directory / 'sheet.xlsx'), config).parse()
+    elapsed = time.perf_counter() - start
+    logger.remove(sink)
+    return elapsed
+
+
+def main(rows: int = 5000):
+    config = json.loads((ROOT / 'config.json').read_text(encoding='utf-8'))
+    config.update(workers=1, cache={'enabled': False})
+    with tempfile.TemporaryDirectory() as name:
+        directory = Path(name)
+        write_meet(directory / 'meet.lef')
+        write_sheet(directory / 'sheet.xlsx', rows, bad=0.2)
+        # Warm-up: imports, base time table
+        run(directory, config, debug=False)
+
+        debug = run(directory, config, debug=True)
+        production = run(directory, config, debug=False)
+        sizes = {p.stem: p.stat().st_size for p in directory.glob('*.log')}
+    print(f'rows:        {rows} (20% bad)')
+    print(f'debug:       {debug * 1000:8.1f} ms  log {sizes["debug"] / 1024:8.0f} KiB')
+    print(f'production:  {production * 1000:8.1f} ms  log {sizes["info"] / 1024:8.0f} KiB'
+          f'  (x{debug / production:.1f})')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
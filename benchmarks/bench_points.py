@@ -0,0 +1,47 @@
+"""Per-row BaseTimeTable.get_point vs the batch PointsEngine.
+
+    python benchmarks/bench_points.py [rows]
+"""
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reg.basetimes import DEFAULT_DIR, DEFAULT_TABLE, load_table  # noqa: E402
+from reg.points import PointsEngine  # noqa: E402
+
+
+def main(rows: int = 100_000):
+    random.seed(0)
+    table = load_table(DEFAULT_DIR / f'{DEFAULT_TABLE}.csv')
+    known = [
+        (c, g, d, s)
+        for c in table.courses for g in table.genders
+        for d in table.distances for s in table.strokes
+        if table.get(c, g, d, s) is not None
+    ]
+    keys = random.choices(known, k=rows)
+    seconds = [table.get(*k) * random.uniform(1.0, 2.5) for k in keys]
+
+    start = time.perf_counter()
+    expected = [table.get_point(*k, s) for k, s in zip(keys, seconds)]
+    per_row = time.perf_counter() - start
+
+    engine = PointsEngine(table)
+    start = time.perf_counter()
+    points = engine.compute([engine.code(*k) for k in keys], seconds)
+    batch = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(points, expected))
+    print(f'rows:       {rows}')
+    print(f'get_point:  {per_row * 1000:8.1f} ms')
+    print(f'batch:      {batch * 1000:8.1f} ms  (x{per_row / batch:.1f})')
+    print(f'mismatches: {mismatches}')
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,53 @@
+"""Headless translation run.
+
+    python convert.py meet.lxf entries.xlsx out.lef [--config config.json] [--profile]
+
+With --profile the run is profiled and out.lef.prof (pstats) and
+out.lef.prof.txt (sorted summary) are written next to the output.
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+
+from lenexpy import tofile
+from loguru import logger
+
+from reg.main import TranslatorLenex
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="XLSX entries -> Lenex")
+    parser.add_argument("lxf", help="meet LXF/LEF to fill")
+    parser.add_argument("xlsx", help="entries table")
+    parser.add_argument("output", help="LXF/LEF to write")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--profile", action="store_true", help="profile the run")
+    parser.add_argument("--debug", action="store_true", help="config['debug'] on")
+    parser.add_argument("--workers", type=int, help="row analysis processes (0 = per CPU)")
+    args = parser.parse_args(argv)
+
+    with open(args.config, "rb") as file:
+        config = json.loads(file.read())
+    config["profile"] = args.profile or config.get("profile", False)
+    config["debug"] = args.debug or config.get("debug", False)
+    if args.workers is not None:
+        config["workers"] = args.workers
+
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG" if config["debug"] else "INFO",
+               backtrace=config["debug"], diagnose=config["debug"])
+
+    translator = TranslatorLenex(args.lxf, args.xlsx, config)
+    lenex = translator.parse()
+    tofile(lenex, args.output)
+    logger.info(f"Сохранено: {args.output}")
+    if translator.profiler is not None:
+        translator.profiler.save(args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    # Needed for the process pool in frozen (nuitka) builds
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,12 +1,12 @@
-from datetime import date, datetime
-import random
-import re
 from typing import TypeVar
-from loguru import logger
 from lenexpy.models.athelete import Athlete
 from lenexpy.models.club import Club
 from lenexpy.models.handicap import Handicap, HandicapClass
 from reg.exceptions import IncorrectGender
+from reg.identity import AthleteIndex
+from reg.logs import rowlog
+from reg.ids import IdAllocator, SequentialIdAllocator
+from reg.settings import Settings
 from reg.row_types import Row
 
 T = TypeVar('T')
@@ -20,10 +20,6 @@ handicaps = {
 }
 
 
-def randid() -> int:
-    return random.randint(1_000_00, 10_000_00-1)
-
-
 class AthleteParser:
     genders = {  # TODO: Add in cofnig
         'мужской': 'M',
@@ -35,37 +31,16 @@ class AthleteParser:
         'мальчики': 'M',
     }
 
-    def parse_bd(format: str, dt: str | datetime) -> date:
-        if isinstance(dt, str):
-            dt = datetime.strptime(dt, format)
-        return dt.date()
-
     def parse_gender(gender: str) -> str:
         gender = gender.strip().lower()
         if gender not in AthleteParser.genders:
             raise IncorrectGender(gender)
         return AthleteParser.genders.get(gender)
 
-    def _parse_license(config, license) -> str:
-        def chg(match: re.Match):
-            t = match.string[match.regs[0][0]:match.regs[0][1]]
-            return t.lower()
-        license = re.sub('[^I]{1}', chg, license)
-
-        for a, b in config['replacement'].items():
-            license = license.replace(a, b)
-        return license
-
-    def get_license(config: dict, license: str | None) -> str | None:
+    def get_license(settings: Settings, license: str | None) -> str | None:
         if license is None:
             return None
-
-        license = AthleteParser._parse_license(
-            config,
-            str(license)
-        )
-        if license in config['licenses']:
-            return license
+        return settings.licenses.get(str(license))
 
     def get_handicap(hand_type: str) -> HandicapClass | None:
         if not hand_type:
@@ -75,29 +50,55 @@ class AthleteParser:
         try:
             return HandicapClass(raw_handicap)
         except Exception:
-            logger.warning(
-                f'[Handicap] Некорректное значение "{hand_type}" пропущено')
+            rowlog.warning(
+                'handicap', '[Handicap] Некорректное значение "{}" пропущено', hand_type)
             return None
 
+    def parse_fields(settings: Settings, row: Row) -> tuple:
+        """Athlete attributes derived from the row alone.
+
+        Returns (birthdate, gender, license, handicap class); computed apart
+        from BaseData so rows can be analysed outside the merge.
+        """
+        hand = AthleteParser.get_handicap(row.start_type)
+        return (
+            settings.birthdates.decode(row.birthday),
+            AthleteParser.parse_gender(row.gender),
+            AthleteParser.get_license(settings, row.license),
+            hand,
+        )
+
 
 class BaseData:
     clubs: dict[str, Club]
-    athletes: dict[str, Athlete]
+    athletes: AthleteIndex
 
-    def __init__(self, config):
+    def __init__(self, settings: Settings, ids: IdAllocator | None = None):
         self.clubs = {}
-        self.athletes = {}
-        self.config = config
+        self.athletes = AthleteIndex(settings.identity_fuzzy, settings.identity_threshold)
+        self.settings = settings
+        self.ids = ids or SequentialIdAllocator()
+        # (athleteid, raw names) already reported as merged
+        self.merged: set[tuple] = set()
 
     def _get_key(self, *args) -> T:
         return ';'.join(map(str, args)).lower()
 
-    def get_athlete(self, club: Club, row: Row):
-        key = self._get_key(row.firstname, row.lastname, row.middlename,
-                            row.gender, row.birthday)
-
-        if key not in self.athletes:
-            hand = AthleteParser.get_handicap(row.start_type)
+    def get_athlete(self, club: Club, row: Row, fields: tuple | None = None,
+                    issues: list | None = None):
+        """Find or register the row's athlete.
+
+        Rows that only match an existing athlete after name normalisation
+        or by fuzzy similarity add an ``athlete_merged`` issue to ``issues``,
+        once per spelling.
+        """
+        fields = fields or AthleteParser.parse_fields(self.settings, row)
+        birthdate, gender, license, hand = fields
+        key = AthleteIndex.key(birthdate, gender, row.lastname, row.firstname,
+                               row.middlename)
+        athlete, similarity = self.athletes.find(key)
+
+        if athlete is None:
             handicap = (
                 Handicap(
                     breast=hand,
@@ -106,23 +107,39 @@ class BaseData:
                 ) if hand else None
             )
             athlete = Athlete(
-                athleteid=randid(),
-                birthdate=AthleteParser.parse_bd(
-                    self.config['birthday'], row.birthday),
-                gender=AthleteParser.parse_gender(row.gender),
+                athleteid=self.ids.allocate('athlete', *key),
+                birthdate=birthdate,
+                gender=gender,
                 firstname=row.firstname,
                 lastname=row.lastname,
                 nameprefix=row.middlename,
-                license=AthleteParser.get_license(self.config, row.license),
+                license=license,
                 handicap=handicap
             )
             club.athletes.append(athlete)
-            self.athletes[key] = athlete
-        else:
-            athlete = self.athletes[key]
+            self.athletes.add(key, athlete)
+        elif issues is not None:
+            self._check_merge(athlete, row, similarity, issues)
 
         return athlete
 
+    def _check_merge(self, athlete: Athlete, row: Row, similarity: float, issues: list):
+        names = (row.lastname, row.firstname, row.middlename)
+        if names == (athlete.lastname, athlete.firstname, athlete.nameprefix):
+            return
+        if (athlete.athleteid, names) in self.merged:
+            return
+        self.merged.add((athlete.athleteid, names))
+
+        spelled = ' '.join(str(n).strip() for n in names if n)
+        known = ' '.join(filter(None, (athlete.lastname, athlete.firstname, athlete.nameprefix)))
+        message = f'{spelled} объединён(а) с {known} ({athlete.birthdate})'
+        rowlog.info('athlete_merged', '[Athletes] {}', message)
+        issues.append(("athlete_merged", message, "warning", {
+            "athleteid": athlete.athleteid,
+            "similarity": round(similarity, 3),
+        }))
+
     def get_club(self, row: Row):
         key = self._get_key(row.club)
 
@@ -133,8 +150,3 @@ class BaseData:
             club = self.clubs[key]
 
         return club
-
-    def get(self, row: Row):
-        club = self.get_club(row)
-        athl = self.get_athlete(club, row)
-        return athl
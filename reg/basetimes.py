@@ -0,0 +1,109 @@
+from array import array
+import csv
+import math
+import os
+from pathlib import Path
+from lenexpy.models.lenex import Lenex
+from loguru import logger
+from reg.exceptions import MissingBaseTime
+from reg.settings import Settings
+
+DEFAULT_DIR = Path(__file__).resolve().parent.parent / 'basetimes'
+DEFAULT_TABLE = 'wr-2024'
+
+
+def _axis(values) -> dict:
+    return {v: i for i, v in enumerate(sorted(set(values), key=str))}
+
+
+class BaseTimeTable:
+    """Base times for FINA points in a dense, pre-indexed form.
+
+    Course, gender, stroke and distance are interned to small integer codes
+    and the times live in one flat ``array('d')``; missing combinations are
+    NaN. ``code()`` gives the flat index, ``-1`` for an unknown key, which
+    points at a trailing NaN slot.
+    """
+
+    def __init__(self, name: str, times: dict[tuple, float]):
+        self.name = name
+        self.courses = _axis(k[0] for k in times)
+        self.genders = _axis(k[1] for k in times)
+        self.distances = _axis(k[2] for k in times)
+        self.strokes = _axis(k[3] for k in times)
+        self._strides = (
+            len(self.genders) * len(self.strokes) * len(self.distances),
+            len(self.strokes) * len(self.distances),
+            len(self.distances),
+        )
+        size = len(self.courses) * self._strides[0]
+        self.base = array('d', [math.nan]) * (size + 1)
+        for key, seconds in times.items():
+            self.base[self.code(*key)] = seconds
+
+    def __len__(self):
+        return sum(not math.isnan(t) for t in self.base)
+
+    def __repr__(self):
+        return f'<BaseTimeTable {self.name} ({len(self)} times)>'
+
+    def code(self, course, gender, distance, stroke) -> int:
+        c, g, s = self._strides
+        try:
+            return (self.courses[course] * c + self.genders[gender] * g
+                    + self.strokes[stroke] * s + self.distances[distance])
+        except KeyError:
+            return -1
+
+    def get(self, course, gender, distance, stroke) -> float | None:
+        seconds = self.base[self.code(course, gender, distance, stroke)]
+        return None if math.isnan(seconds) else seconds
+
+    def get_point(self, course, gender, distance, stroke, seconds: float) -> float:
+        base = self.get(course, gender, distance, stroke)
+        if base is None:
+            raise MissingBaseTime((str(course), gender, distance, stroke))
+        return 1000 * (base / seconds) ** 3
+
+
+def read_table(path: str | Path) -> BaseTimeTable:
+    """Read a ``course,gender,distance,stroke,time`` CSV; time in seconds."""
+    path = Path(path)
+    times = {}
+    with open(path, encoding='utf-8', newline='') as file:
+        for line, rec in enumerate(csv.DictReader(file), 2):
+            try:
+                key = (rec['course'].strip().upper(), rec['gender'].strip().upper(),
+                       int(rec['distance']), rec['stroke'].strip().upper())
+                times[key] = float(rec['time'])
+            except (KeyError, TypeError, ValueError, AttributeError) as exc:
+                raise ValueError(f'{path.name}:{line}: некорректная строка ({exc})') from None
+    return BaseTimeTable(path.stem, times)
+
+
+_tables: dict[Path, tuple[float, BaseTimeTable]] = {}
+
+
+def load_table(path: str | Path) -> BaseTimeTable:
+    """Loaded once per process; re-read only when the file changes."""
+    path = Path(path).resolve()
+    mtime = os.stat(path).st_mtime
+    cached = _tables.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    table = read_table(path)
+    logger.info(f'[BaseTime] Загружена таблица {table.name}: {len(table)} базовых времён')
+    _tables[path] = (mtime, table)
+    return table
+
+
+def table_name(settings: Settings, lenex: Lenex | None = None) -> str:
+    """Per-meet override from ``basetime.meets``, else ``basetime.table``."""
+    if lenex is not None and (name := settings.basetime_meets.get(lenex.meet.name)):
+        return name
+    return settings.basetime_table or DEFAULT_TABLE
+
+
+def get_table(settings: Settings, lenex: Lenex | None = None) -> BaseTimeTable:
+    directory = settings.basetime_dir or DEFAULT_DIR
+    return load_table(directory / f'{table_name(settings, lenex)}.csv')
@@ -0,0 +1,134 @@
+from datetime import date, datetime
+from itertools import islice
+import re
+from typing import Callable, Iterable
+from loguru import logger
+
+_dmy = re.compile(r'(\d{1,2})([./-])(\d{1,2})\2(\d{4})').fullmatch
+_ymd = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})').fullmatch
+_year = re.compile(r'\d{4}').fullmatch
+
+
+def _parse_dmy(value: str, sep: str) -> date | None:
+    match = _dmy(value)
+    if match is None or match.group(2) != sep:
+        return None
+    day, _, month, year = match.groups()
+    return date(int(year), int(month), int(day))
+
+
+def _parse_ymd(value: str) -> date | None:
+    match = _ymd(value)
+    if match is None:
+        return None
+    return date(*map(int, match.groups()))
+
+
+def _parse_year(value: str) -> date | None:
+    return date(int(value), 1, 1) if _year(value) else None
+
+
+# Formats recognised by detection, each with a strptime-free parser that
+# accepts what strptime would and returns None otherwise.
+PARSERS: dict[str, Callable[[str], date | None]] = {
+    '%d.%m.%Y': lambda v: _parse_dmy(v, '.'),
+    '%d/%m/%Y': lambda v: _parse_dmy(v, '/'),
+    '%d-%m-%Y': lambda v: _parse_dmy(v, '-'),
+    '%Y-%m-%d': _parse_ymd,
+    '%Y': _parse_year,
+}
+
+
+class BirthdateDecoder:
+    """Birthday cells -> date.
+
+    Excel date cells come in as datetime and are used as is; a numeric
+    cell holding a plausible year means January 1st of that year. For text
+    the column's format is detected once from a sample (the configured
+    ``config['birthday']`` wins when it fits) and served by a specialised
+    parser. The other known formats are tried when it fails, strptime with
+    the configured format is the last resort, and results are memoised.
+    """
+
+    sample_size = 200
+    years = range(1900, 2100)
+
+    def __init__(self, format: str = '%d.%m.%Y'):
+        self.format = format
+        self.formats: tuple[str, ...] = self._order(format)
+        self.cache: dict = {}
+        self.hits = 0
+
+    def _order(self, first: str) -> tuple[str, ...]:
+        return tuple(dict.fromkeys((first, self.format, *PARSERS)))
+
+    def detect(self, values: Iterable) -> str:
+        """Pick the text format that parses most of a sample of ``values``."""
+        sample = list(islice(
+            (v.strip() for v in values if isinstance(v, str) and v.strip()),
+            self.sample_size,
+        ))
+        if not sample:
+            return self.formats[0]
+
+        def hits(format: str) -> int:
+            return sum(self._try(format, v) is not None for v in sample)
+
+        best = max(self._order(self.format), key=hits)
+        if best != self.formats[0]:
+            logger.info(f'[Birthday] Формат даты рождения определён как {best}')
+            self.formats = self._order(best)
+            self.cache.clear()
+        return best
+
+    def _try(self, format: str, value: str) -> date | None:
+        parser = PARSERS.get(format)
+        try:
+            if parser is not None:
+                return parser(value)
+            return datetime.strptime(value, format).date()
+        except ValueError:
+            return None
+
+    def _decode(self, value) -> date:
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool) \
+                and value == int(value) and int(value) in self.years:
+            return date(int(value), 1, 1)
+        if isinstance(value, str):
+            text = value.strip()
+            for format in self.formats:
+                if (parsed := self._try(format, text)) is not None:
+                    return parsed
+            # Raises with strptime's own message
+            return datetime.strptime(value, self.format).date()
+        raise ValueError(f'Unsupported birthday value {value!r}')
+
+    def decode(self, value) -> date:
+        try:
+            parsed = self.cache[value]
+        except KeyError:
+            pass
+        except TypeError:
+            return self._decode(value)
+        else:
+            self.hits += 1
+            return parsed
+        parsed = self.cache[value] = self._decode(value)
+        return parsed
+
+    def decode_column(self, values: Iterable) -> list[date | None]:
+        """Detect the format on the column and decode all of it; values that
+        can't be decoded come back as None."""
+        values = list(values)
+        self.detect(values)
+        result = []
+        for value in values:
+            try:
+                result.append(self.decode(value))
+            except Exception:
+                result.append(None)
+        return result
@@ -0,0 +1,140 @@
+from datetime import date, datetime, time, timedelta
+from hashlib import sha256
+import json
+import os
+from pathlib import Path
+import zlib
+from loguru import logger
+
+DEFAULT_DIR = Path.home() / '.lenex-converter' / 'cache'
+
+# Cell values JSON has no type for, as single-key tagged objects
+_TAGS = {
+    '$datetime': datetime.fromisoformat,
+    '$date': date.fromisoformat,
+    '$time': time.fromisoformat,
+    '$timedelta': lambda seconds: timedelta(seconds=seconds),
+}
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, time):
+        return {'$time': value.isoformat()}
+    if isinstance(value, timedelta):
+        return {'$timedelta': value.total_seconds()}
+    raise TypeError(f'{type(value).__name__} не кэшируется')
+
+
+def _decode(obj: dict):
+    if len(obj) == 1:
+        (tag, value), = obj.items()
+        if tag in _TAGS:
+            return _TAGS[tag](value)
+    raise ValueError(f'Неизвестное значение {obj!r}')
+
+
+def dumps(rows: list[tuple]) -> bytes:
+    return zlib.compress(json.dumps(rows, default=_encode, ensure_ascii=False,
+                                    separators=(',', ':')).encode('utf-8'), 6)
+
+
+def loads(data: bytes) -> list[tuple]:
+    rows = json.loads(zlib.decompress(data), object_hook=_decode)
+    if not isinstance(rows, list) or not all(isinstance(r, list) for r in rows):
+        raise ValueError('ожидался список строк')
+    return [tuple(r) for r in rows]
+
+
+class WorkbookCache:
+    """On-disk cache of extracted sheet values.
+
+    Entries are keyed by the SHA-256 of the XLSX content and the sheet, and
+    stored as zlib-compressed JSON of the row tuples (dates and times as
+    tagged objects), so reading an entry never runs code. Sheets with
+    values JSON can't hold are not cached. The directory is
+    kept under ``max_bytes`` by evicting the least recently used entries;
+    a hit refreshes the entry's mtime.
+    """
+
+    suffix = '.rows'
+
+    def __init__(self, directory: str | Path = DEFAULT_DIR, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, path: str, sheet: str = 'active') -> str:
+        digest = sha256()
+        with open(path, 'rb') as file:
+            while chunk := file.read(1 << 20):
+                digest.update(chunk)
+        return f'{digest.hexdigest()}-{sha256(sheet.encode()).hexdigest()[:8]}'
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + self.suffix)
+
+    def get(self, key: str) -> list[tuple] | None:
+        path = self._path(key)
+        try:
+            rows = loads(path.read_bytes())
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as exc:
+            logger.warning(f'[Cache] Повреждённая запись {path.name} удалена: {exc}')
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return rows
+
+    def put(self, key: str, rows: list[tuple]):
+        try:
+            data = dumps(rows)
+        except (TypeError, ValueError) as exc:
+            logger.debug(f'[Cache] Лист не сохранён в кэш: {exc}')
+            return
+        if len(data) > self.max_bytes:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self.directory.glob('*' + self.suffix):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        for path in self.directory.glob('*' + self.suffix):
+            path.unlink(missing_ok=True)
+
+
+def get_workbook_cache(config: dict) -> WorkbookCache | None:
+    cache = config.get('cache', {})
+    if not cache.get('enabled', False):
+        return None
+    return WorkbookCache(
+        cache.get('dir') or DEFAULT_DIR,
+        int(cache.get('max_mb', 256)) * 1024 * 1024,
+    )
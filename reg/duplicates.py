@@ -0,0 +1,65 @@
+import math
+from typing import Iterable
+from lenexpy.models.athelete import Athlete
+from lenexpy.models.entry import Entry
+from reg.event_parser import RowRecord, get_only_time
+
+
+class Duplicate:
+    """Entries of one athlete in the same event, with the rows they came from."""
+    __slots__ = ('athlete', 'eventid', 'entries', 'rows', 'kept')
+
+    def __init__(self, athlete: Athlete, eventid: int, entries: list[Entry], rows: list[int | None]):
+        self.athlete = athlete
+        self.eventid = eventid
+        self.entries = entries
+        self.rows = rows
+        # Row of the entry kept by keep_fastest()
+        self.kept: int | None = None
+
+
+def find_duplicates(athletes: Iterable[Athlete], records: list[RowRecord]) -> list[Duplicate]:
+    """One pass over all entries, grouped by (athlete, eventid)."""
+    rows = {id(r.entry): r.i for r in records if r.entry is not None}
+    found = []
+    for athlete in athletes:
+        events: dict[int, list[Entry]] = {}
+        for entry in athlete.entries:
+            events.setdefault(entry.eventid, []).append(entry)
+        if len(events) == len(athlete.entries):
+            continue
+        for eventid, entries in events.items():
+            if len(entries) > 1:
+                found.append(Duplicate(athlete, eventid, entries,
+                                       [rows.get(id(e)) for e in entries]))
+    return found
+
+
+def _seconds(record_time) -> float:
+    # No time (NT) sorts after any real one
+    seconds = get_only_time(record_time)
+    return seconds if seconds else math.inf
+
+
+def keep_fastest(duplicates: list[Duplicate], records: list[RowRecord]) -> int:
+    """Drop all but the fastest entry of every duplicate; returns how many
+    entries were dropped.
+
+    Entry times are compared as written in the sheet, before the points
+    policy, so re-applying the policy later can't change which one stays.
+    Ties keep the earliest row.
+    """
+    times = {id(r.entry): _seconds(r.row.entrytime) for r in records if r.entry is not None}
+    dropped: dict[int, set[int]] = {}
+    for duplicate in duplicates:
+        entries = duplicate.entries
+        k = min(range(len(entries)), key=lambda k: times.get(id(entries[k]), math.inf))
+        keep, duplicate.kept = entries[k], duplicate.rows[k]
+        dropped.setdefault(id(duplicate.athlete), set()).update(
+            id(e) for e in duplicate.entries if e is not keep)
+
+    athletes = {id(d.athlete): d.athlete for d in duplicates}
+    for key, ids in dropped.items():
+        athlete = athletes[key]
+        athlete.entries = [e for e in athlete.entries if id(e) not in ids]
+    return sum(map(len, dropped.values()))
@@ -0,0 +1,99 @@
+from datetime import time, timedelta
+import math
+import re
+from typing import Callable, Iterable
+from reg.logs import rowlog
+
+ZERO = time()
+
+_match = re.compile(r'(?:(\d{1,2})[:.,])?(\d{1,2})[:.,](\d{1,2})').fullmatch
+
+
+def _from_float(et: float, index: int) -> time:
+    if math.isnan(et) or et <= 0:
+        return ZERO
+    return time(0, int(et // 60), int(et % 60), round((et - int(et)) * 1_000_000))
+
+
+def _from_timedelta(et: timedelta, index: int) -> time:
+    total_seconds = et.total_seconds()
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+    return time(0, int(hours), int(minutes), int(seconds))
+
+
+def _from_time(et: time, index: int) -> time:
+    # Excel reads "1:05" typed into a cell as h:mm, shift it to m:ss.
+    return time(0, et.hour, et.minute, et.microsecond)
+
+
+class EntryTimeParser:
+    """Entry time cells ("m:ss.hh", "ss.hh", seconds, Excel times) -> time.
+
+    Values are dispatched on their exact type. Text is matched against a
+    pattern compiled once, ``[m:]ss.hh`` with any of ``: . ,`` as the
+    separator, and parsed strings are memoised, since a column repeats the
+    same few times over and over.
+    """
+
+    max_cache = 1 << 16
+
+    def __init__(self):
+        self.cache: dict[str, time] = {}
+        self.hits = 0
+        self.dispatch: dict[type, Callable[[object, int], time]] = {
+            str: self.from_text,
+            float: _from_float,
+            timedelta: _from_timedelta,
+            time: _from_time,
+        }
+
+    def parse(self, et, index: int) -> time:
+        handler = self.dispatch.get(type(et))
+        if handler is None:
+            handler = next(
+                (h for t, h in self.dispatch.items() if isinstance(et, t)),
+                self.from_text,
+            )
+        return handler(et, index)
+
+    def parse_column(self, values: Iterable, start: int = 0) -> list[time]:
+        """Parse a whole column; ``start`` is the row index of the first value."""
+        dispatch = self.dispatch
+        cache = self.cache
+        result = []
+        append = result.append
+        hits = 0
+        for index, et in enumerate(values, start):
+            if type(et) is str and (parsed := cache.get(et)) is not None:
+                append(parsed)
+                hits += 1
+            else:
+                append((dispatch.get(type(et)) or self.parse)(et, index))
+        self.hits += hits
+        return result
+
+    def from_text(self, et: str, index: int) -> time:
+        if (parsed := self.cache.get(et)) is not None:
+            self.hits += 1
+            return parsed
+        text = et.strip()
+        match = _match(text)
+        if match is None:
+            if text and text.lower() != 'nt':
+                rowlog.warning(
+                    'entrytime', '[{}]: Игнорирование времени из-за сбоя обработки ({})', index, text)
+            return ZERO
+        minutes, seconds, hsec = match.groups()
+        try:
+            parsed = time(0, int(minutes) if minutes else 0, int(seconds), int(hsec) * 10_000)
+        except Exception as err:
+            rowlog.warning(
+                'entrytime', '[{}]: Игнорирование времени из-за сбоя обработки ({};{})',
+                index, err, text)
+            return ZERO
+        if len(self.cache) >= self.max_cache:
+            self.cache.clear()
+        self.cache[et] = parsed
+        return parsed
@@ -0,0 +1,132 @@
+from bisect import bisect_right
+from datetime import date
+from typing import List, Tuple
+from lenexpy.models.lenex import Lenex
+from lenexpy.models.agegroup import AgeGroup
+from lenexpy.models.event import Event
+
+
+def sum_age_groups(agegroups: List[AgeGroup]):
+    if not agegroups:
+        return -1, -1
+    amax, amin = None, None
+    for group in agegroups:
+        if amax is None or ((group.agemax > amax or group.agemax == -1) and amax != -1):
+            amax = group.agemax
+        if amin is None or ((group.agemin < amin or group.agemin == -1) and amin != -1):
+            amin = group.agemin
+    return amin, amax
+
+
+def get_swimstyles(lenex: Lenex):
+    events = {}
+    for session in lenex.meet.sessions:
+        for event in session.events:
+            key = (event.gender,
+                   event.swimstyle.stroke,
+                   event.swimstyle.distance)
+            events.setdefault(key, [])
+            events[key].append((
+                sum_age_groups(event.agegroups),
+                event
+            ))
+    return events
+
+
+def check_age(age: int, minage: int, maxage: int):
+    if minage == -1 and maxage == -1:
+        return True
+    if age <= maxage and minage == -1:
+        return True
+    if age >= minage and maxage == -1:
+        return True
+    return minage <= age <= maxage
+
+
+class AgeIntervalIndex:
+    """Age lookup over the candidates of one (gender, stroke, distance) key.
+
+    Candidate ranges are cut into integer segments at build time and every
+    segment remembers the first candidate (in meet order) that covers it, so
+    a lookup is a single bisect. ``-1`` bounds are open-ended.
+    """
+
+    def __init__(self, candidates: list[Tuple[Tuple[int, int], Event]]):
+        self.candidates = candidates
+
+        points = set()
+        for (minage, maxage), _ in candidates:
+            if minage != -1:
+                points.add(minage)
+            if maxage != -1:
+                points.add(maxage + 1)
+        self.bounds = sorted(points)
+
+        probes = [self.bounds[0] - 1 if self.bounds else 0] + self.bounds
+        self.segments = [
+            next((c for c in candidates if check_age(age, *c[0])), None)
+            for age in probes
+        ]
+
+    def lookup(self, age: int) -> Tuple[Tuple[Tuple[int, int], Event], bool]:
+        """Return the matching candidate, or the EXH fallback flagged True."""
+        found = self.segments[bisect_right(self.bounds, age)]
+        if found is None:
+            return self.candidates[0], True
+        return found, False
+
+
+class EventIndex:
+    """Prebuilt (gender, stroke, distance) -> [(age range, Event)] map of a meet.
+
+    Built once per run and shared by every RowParser. The map is rebuilt
+    lazily when the meet's session or event lists change. Ages are counted
+    against ``reference_date``, fixed for the whole run.
+    """
+
+    def __init__(self, lenex: Lenex, reference_date: date | None = None):
+        self.lenex = lenex
+        self.reference_date = reference_date or date.today()
+        self._events: dict | None = None
+        self._by_id: dict[int, Event] = {}
+        self._ages: dict[tuple, AgeIntervalIndex] = {}
+        self._fingerprint: tuple | None = None
+
+    def _get_fingerprint(self) -> tuple:
+        sessions = self.lenex.meet.sessions
+        return (id(self.lenex.meet), id(sessions)) + tuple(
+            (id(s.events), len(s.events)) for s in sessions
+        )
+
+    def invalidate(self):
+        self._events = None
+        self._by_id = {}
+        self._ages = {}
+        self._fingerprint = None
+
+    @property
+    def events(self) -> dict[tuple, list[Tuple[Tuple[int, int], Event]]]:
+        fingerprint = self._get_fingerprint()
+        if self._events is None or fingerprint != self._fingerprint:
+            self._events = get_swimstyles(self.lenex)
+            self._by_id = {
+                event.eventid: event
+                for candidates in self._events.values()
+                for _, event in candidates
+            }
+            self._ages = {}
+            self._fingerprint = fingerprint
+        return self._events
+
+    def get_event(self, eventid: int) -> Event:
+        self.events  # rebuilds both maps if the meet changed
+        return self._by_id[eventid]
+
+    def ages(self, gender, stroke, distance) -> AgeIntervalIndex | None:
+        events = self.events
+        key = (gender, stroke, distance)
+        if (index := self._ages.get(key)) is None:
+            if not (candidates := events.get(key)):
+                return None
+            index = self._ages[key] = AgeIntervalIndex(candidates)
+        return index
@@ -1,22 +1,20 @@
 from datetime import date, time
-import random
-from typing import List, Optional, Tuple
+from time import perf_counter
+from typing import Iterable, Optional, Tuple
 from loguru import logger
-from reg.athlete_parser import BaseData
+from reg.athlete_parser import AthleteParser, BaseData
+from reg.event_index import EventIndex
+from reg.heats import HeatRegistry
 from reg.exceptions import IncorrectAge, IncorrectDistance
 from reg.issues import IssueCollector
-from reg.row_types import Row, RowValidate
+from reg.logs import rowlog
+from reg.row_types import Row, RowDecoder
+from reg.settings import Settings
+from reg.workbook import SheetValues
 from lenexpy.models.lenex import Lenex
-from lenexpy.models.agegroup import AgeGroup
 from lenexpy.models.event import Event
-from lenexpy.models.athelete import Athlete
 from lenexpy.models.entry import Entry, Status as EntryStatus
-from lenexpy.models.heat import Heat, StatusHeat
-from lenexpy.ext.basetime import BaseTime
-
-bt = BaseTime.null()
-bt.data = {('LCM', 'M', 50, 'FREE'): 20.91, ('LCM', 'M', 100, 'FREE'): 46.86, ('LCM', 'M', 200, 'FREE'): 102, ('LCM', 'M', 400, 'FREE'): 220.07, ('LCM', 'M', 800, 'FREE'): 452.12, ('LCM', 'M', 1500, 'FREE'): 871.02, ('LCM', 'M', 50, 'BACK'): 23.55, ('LCM', 'M', 100, 'BACK'): 51.6, ('LCM', 'M', 200, 'BACK'): 111.92, ('LCM', 'M', 50, 'BREAST'): 25.95, ('LCM', 'M', 100, 'BREAST'): 56.88, ('LCM', 'M', 200, 'BREAST'): 125.48, ('LCM', 'M', 50, 'FLY'): 22.27, ('LCM', 'M', 100, 'FLY'): 49.45, ('LCM', 'M', 200, 'FLY'): 110.34, ('LCM', 'M', 200, 'MEDLEY'): 114, ('LCM', 'M', 400, 'MEDLEY'): 242.5, ('LCM', 'F', 50, 'FREE'): 23.61, ('LCM', 'F', 100, 'FREE'): 51.71, ('LCM', 'F', 200, 'FREE'): 112.85, ('LCM', 'F', 400, 'FREE'): 235.38, ('LCM', 'F', 800, 'FREE'): 484.79, ('LCM', 'F', 1500, 'FREE'): 920.48, ('LCM', 'F', 50, 'BACK'): 26.86, ('LCM', 'F', 100, 'BACK'): 57.33, ('LCM', 'F', 200, 'BACK'): 123.14, ('LCM', 'F', 50, 'BREAST'): 29.16, ('LCM', 'F', 100, 'BREAST'): 64.13, ('LCM', 'F', 200, 'BREAST'): 137.55, ('LCM', 'F', 50, 'FLY'): 24.43, ('LCM', 'F', 100, 'FLY'): 55.48, ('LCM', 'F', 200, 'FLY'): 121.81, ('LCM', 'F', 200, 'MEDLEY'): 126.12, ('LCM', 'F', 400, 'MEDLEY'): 265.87, ('SCM', 'M', 50, 'FREE'): 20.16,
-           ('SCM', 'M', 100, 'FREE'): 44.84, ('SCM', 'M', 200, 'FREE'): 99.37, ('SCM', 'M', 400, 'FREE'): 212.25, ('SCM', 'M', 800, 'FREE'): 440.46, ('SCM', 'M', 1500, 'FREE'): 846.88, ('SCM', 'M', 50, 'BACK'): 22.11, ('SCM', 'M', 100, 'BACK'): 48.33, ('SCM', 'M', 200, 'BACK'): 105.63, ('SCM', 'M', 50, 'BREAST'): 24.95, ('SCM', 'M', 100, 'BREAST'): 55.28, ('SCM', 'M', 200, 'BREAST'): 120.16, ('SCM', 'M', 50, 'FLY'): 21.75, ('SCM', 'M', 100, 'FLY'): 47.78, ('SCM', 'M', 200, 'FLY'): 106.85, ('SCM', 'M', 200, 'MEDLEY'): 109.63, ('SCM', 'M', 400, 'MEDLEY'): 234.81, ('SCM', 'M', 100, 'MEDLEY'): 49.28, ('SCM', 'F', 50, 'FREE'): 22.93, ('SCM', 'F', 100, 'FREE'): 50.25, ('SCM', 'F', 200, 'FREE'): 110.31, ('SCM', 'F', 400, 'FREE'): 231.3, ('SCM', 'F', 800, 'FREE'): 477.42, ('SCM', 'F', 1500, 'FREE'): 908.24, ('SCM', 'F', 50, 'BACK'): 25.25, ('SCM', 'F', 100, 'BACK'): 54.89, ('SCM', 'F', 200, 'BACK'): 118.94, ('SCM', 'F', 50, 'BREAST'): 28.37, ('SCM', 'F', 100, 'BREAST'): 62.36, ('SCM', 'F', 200, 'BREAST'): 134.57, ('SCM', 'F', 50, 'FLY'): 24.38, ('SCM', 'F', 100, 'FLY'): 54.05, ('SCM', 'F', 200, 'FLY'): 119.61, ('SCM', 'F', 200, 'MEDLEY'): 121.86, ('SCM', 'F', 400, 'MEDLEY'): 258.94, ('SCM', 'F', 100, 'MEDLEY'): 56.51}
+from lenexpy.models.swimtime import SwimTime
 
 
 def get_only_time(entrytime: time):
@@ -28,48 +26,157 @@ def get_only_time(entrytime: time):
     )
 
 
-def sum_age_groups(agegroups: List[AgeGroup]):
-    if not agegroups:
-        return -1, -1
-    amax, amin = None, None
-    for group in agegroups:
-        if amax is None or ((group.agemax > amax or group.agemax == -1) and amax != -1):
-            amax = group.agemax
-        if amin is None or ((group.agemin < amin or group.agemin == -1) and amin != -1):
-            amin = group.agemin
-    return amin, amax
+def get_age(birthdate: date, today: date | None = None) -> int:
+    return (today or date.today()).year-birthdate.year
+
+
+class RowRecord:
+    """Outcome of analysing one row, independent of the shared run state.
+
+    Plain and picklable, so rows can be analysed in worker processes and
+    merged into BaseData in the parent, in row order.
+    """
+    __slots__ = ('i', 'row', 'athlete', 'stroke', 'eventid', 'status',
+                 'points', 'entrytime', 'issues', 'error', 'entry', 'elapsed')
+
+    def __init__(self, i: int, row: Row | None = None, error: Exception | None = None):
+        self.i = i
+        self.row = row
+        self.athlete: tuple | None = None
+        self.stroke: str | None = None
+        self.eventid: int | None = None
+        self.status: EntryStatus | None = None
+        self.points: float | None = None
+        self.entrytime: time | None = None
+        self.issues: list[tuple] = []
+        self.error = error
+        # Set by RowParser.apply() in the process that owns the Lenex
+        self.entry: Entry | None = None
+        # Seconds spent on the row, with config['row_timing'] on
+        self.elapsed = 0.0
+
+
+def decode_row(i: int, values, sheet: SheetValues | None, settings: Settings,
+               decoder: RowDecoder) -> RowRecord:
+    """Decode one row into a record; pass ``sheet=None`` when cell
+    references are already resolved."""
+    if settings.debug:
+        logger.debug('Обработка {} строк: {}', i, values)
+    try:
+        if sheet is not None:
+            values = sheet.resolve_row(values)
+        return RowRecord(i, decoder.decode(values, i))
+    except Exception as exc:
+        return RowRecord(i, error=exc)
+
+
+def match_row(record: RowRecord, lenex: Lenex, settings: Settings,
+              events: EventIndex) -> RowRecord:
+    """Analyse a decoded row: athlete fields, stroke and event."""
+    if record.row is None:
+        return record
+    return RowParser(record.row, record.i, lenex, settings, None,
+                     events=events, record=record).analyze()
+
+
+def decode_rows(rows: Iterable[tuple[int, tuple]], sheet: SheetValues | None,
+                settings: Settings, decoder: RowDecoder) -> list[RowRecord]:
+    if not settings.row_timing:
+        return [decode_row(i, values, sheet, settings, decoder) for i, values in rows]
+    records = []
+    for i, values in rows:
+        start = perf_counter()
+        record = decode_row(i, values, sheet, settings, decoder)
+        record.elapsed += perf_counter() - start
+        records.append(record)
+    return records
+
+
+def match_rows(records: list[RowRecord], lenex: Lenex, settings: Settings,
+               events: EventIndex) -> list[RowRecord]:
+    if not settings.row_timing:
+        return [match_row(r, lenex, settings, events) for r in records]
+    for record in records:
+        start = perf_counter()
+        match_row(record, lenex, settings, events)
+        record.elapsed += perf_counter() - start
+    return records
+
+
+def check_points(entrytime: time, point: float | None, settings: Settings) -> tuple[time, tuple | None]:
+    """The points policy for one row: the entry time to write and the
+    points_policy issue (as in RowRecord.issues) if the row violates it."""
+    if entrytime.isoformat() == '00:00:00' or not settings.points_enabled:
+        return entrytime, None
+    if settings.points_max > point > settings.points_min:
+        return entrytime, None
+    return time(), (
+        "points_policy",
+        f'Нарушение политики очков ({point:.5f};{entrytime})',
+        "warning",
+        {"points": round(point, 5), "entrytime": str(entrytime)},
+    )
+
+
+def warn_points(i: int, point: float, entrytime: time):
+    rowlog.warning('points_policy', '[{}]: Нарушение политики очков ({:.5f};{})',
+                   i, point, entrytime)
 
 
-def get_swimstyles(lenex: Lenex):
-    events = {}
-    for session in lenex.meet.sessions:
-        for event in session.events:
-            key = (event.gender,
-                   event.swimstyle.stroke,
-                   event.swimstyle.distance)
-            events.setdefault(key, [])
-            events[key].append((
-                sum_age_groups(event.agegroups),
-                event
-            ))
-    return events
+def _points_issue(record: RowRecord) -> tuple | None:
+    return next((issue for issue in record.issues if issue[0] == "points_policy"), None)
 
 
-def get_age(athlete: Athlete) -> int:
-    return date.today().year-athlete.birthdate.year
+def reapply_points(records: list[RowRecord], settings: Settings,
+                   collector: IssueCollector | None = None) -> bool:
+    """Re-run only the points policy over the merged records of a previous
+    run and patch their entries in place.
 
+    Only rows whose outcome changed touch the collector: their old
+    points_policy issue is removed and the new one added.
 
-def check_age(age: int, minage: int, maxage: int):
-    if minage == -1 and maxage == -1:
-        return True
-    if age <= maxage and minage == -1:
-        return True
-    if age >= minage and maxage == -1:
-        return True
-    return minage <= age <= maxage
+    Returns False when the result could differ from a full run: the policy
+    is now enabled but some points were never computed, or it is now
+    disabled and some rows were dropped for a missing base time (records
+    without an entry), which a full run would merge.
+    """
+    if settings.points_enabled:
+        if any(r.entry is not None and r.points is None
+               and r.row.entrytime.isoformat() != '00:00:00' for r in records):
+            return False
+    elif any(r.entry is None for r in records):
+        return False
 
+    removed, added = [], []
+    for record in records:
+        if record.entry is None:
+            continue
+        entrytime, issue = check_points(record.row.entrytime, record.points, settings)
+        if entrytime != record.entrytime:
+            record.entrytime = entrytime
+            record.entry.entrytime = SwimTime(
+                entrytime.hour, entrytime.minute,
+                entrytime.second, entrytime.microsecond // 10_000)
+        old = _points_issue(record)
+        if issue == old:
+            continue
+        if old is not None:
+            record.issues.remove(old)
+            removed.append((record, old))
+        if issue is not None:
+            record.issues.append(issue)
+            added.append((record, issue))
+            warn_points(record.i, record.points, record.row.entrytime)
 
-heats = {}
+    if collector is not None and (removed or added):
+        collector.remove("points_policy", [
+            (record.i, message, level, extra) for record, (_, message, level, extra) in removed])
+        for record, (category, message, level, extra) in added:
+            collector.add(category=category, message=message, level=level,
+                          row_index=record.i, row=record.row, extra=extra)
+        if added:
+            collector.sort()
+    return True
 
 
 class RowParser:
@@ -78,135 +185,117 @@ class RowParser:
         row: Row,
         i: int,
         lenex: Lenex,
-        config: dict,
-        basedata: BaseData,
-        collector: IssueCollector | None = None
+        settings: Settings,
+        basedata: BaseData | None,
+        collector: IssueCollector | None = None,
+        events: EventIndex | None = None,
+        heats: HeatRegistry | None = None,
+        record: RowRecord | None = None
     ):
         self.row = row
         self.i = i
         self.lenex = lenex
-        self.config = config
+        self.settings = settings
         self.basedata = basedata
-        self.events = get_swimstyles(lenex)
+        self.events = events or EventIndex(lenex)
+        self.heats = heats
         self.collector = collector
-
-    def _serialize_row(self):
-        """Return plain dict of row fields for UI-friendly formatting."""
-        data = {}
-        for name, item in type(self.row).__dict__.items():
-            if not isinstance(item, RowValidate):
-                continue
-            value = getattr(self.row, name, None)
-            data[name] = value
-        return data
+        self.record = record or RowRecord(i, row)
 
     def _add_issue(self, category: str, message: str, *, level: str = "warning", extra: dict | None = None):
+        self.record.issues.append((category, message, level, extra or {}))
+
+    def _report(self, issues: list[tuple]):
         if self.collector is None:
             return
-        self.collector.add(
-            category=category,
-            message=message,
-            level=level,
-            row_index=self.i,
-            row_repr=repr(self.row),
-            row_data=self._serialize_row(),
-            extra=extra or {},
-        )
+        for category, message, level, extra in issues:
+            self.collector.add(
+                category=category,
+                message=message,
+                level=level,
+                row_index=self.i,
+                row=self.row,
+                extra=extra,
+            )
+
+    def analyze(self) -> RowRecord:
+        """Everything that depends on the row alone; errors are kept in the
+        record and re-raised by apply() after the athlete is registered.
 
-    def parse(self):
-        self.athlete = self.basedata.get(self.row)
+        Points are left to reg.points.score_records.
+        """
+        record = self.record
+        try:
+            record.athlete = AthleteParser.parse_fields(self.settings, self.row)
+            self.birthdate, self.gender = record.athlete[:2]
+
+            self.stroke = record.stroke = self.settings.stroke(self.row.stroke)
+            event, record.status = self.find_event()
+            record.eventid = event.eventid
+        except Exception as exc:
+            record.error = exc
+        return record
 
-        self.stroke = self.config['reversed_styles'][self.row.stroke.strip(
-        ).lower()]
-        event, status = self.find_event()
+    def apply(self, record: RowRecord):
+        club = self.basedata.get_club(self.row)
+        if record.athlete is None:
+            raise record.error
+        self.athlete = self.basedata.get_athlete(
+            club, self.row, record.athlete, record.issues)
 
-        self.entrytime = self.validate_entrytime()
+        self._report(record.issues)
+        if record.error is not None:
+            raise record.error
 
+        event = self.events.get_event(record.eventid)
         if self.row.heat and self.row.lane:
-            key = (event, self.athlete.gender, self.row.heat)
-            if not (heatid := heats.get(key)):
-                heatid = random.randint(1000, 10_000)
-                heats[key] = heatid
-                heat = Heat(
-                    heatid=heatid,
-                    number=self.row.heat,
-                    order=self.row.heat,
-                    status=StatusHeat.SEEDED
-                )
-                if not event.heats:
-                    event.heats = []
-                event.heats.append(heat)
+            if self.heats is None:
+                self.heats = HeatRegistry(self.lenex)
+            heatid = self.heats.get(
+                event, self.athlete.gender, self.row.heat)
         else:
             heatid = None
 
         entry = Entry(
             eventid=event.eventid,
-            entrytime=self.entrytime,
-            status=status
+            entrytime=record.entrytime,
+            status=record.status
         )
         if heatid and self.row.lane:
             entry.heatid = heatid
             entry.lane = self.row.lane
 
         self.athlete.entries.append(entry)
+        record.entry = entry
 
     def find_event(self) -> Tuple[Event, Optional[EntryStatus]]:
-        try:
-            events = self.events[(self.athlete.gender,
-                                  self.stroke, self.row.distance)]
-        except KeyError:
-            message = f"No distances found by parameters {self.athlete.gender}, {self.stroke}, {self.row.distance}"
-            self._add_issue("incorrect_distance", message, level="error")
-            raise IncorrectDistance(message)
-
-        if len(events) == 0:
-            message = f"No distances found by parameters {self.athlete.gender}, {self.stroke}, {self.row.distance}"
-            self._add_issue("incorrect_distance", message, level="error")
+        ages = self.events.ages(self.gender, self.stroke, self.row.distance)
+        if ages is None:
+            message = f"No distances found by parameters {self.gender}, {self.stroke}, {self.row.distance}"
+            self._add_issue("incorrect_distance", message, level="error", extra={
+                "gender": self.gender, "stroke": self.stroke, "distance": self.row.distance})
             raise IncorrectDistance(message)
 
-        for (min, max), e in events:
-            if check_age(get_age(self.athlete), min, max):
-                return e, None
+        age = get_age(self.birthdate, self.events.reference_date)
+        ((min, max), event), exh = ages.lookup(age)
+        if not exh:
+            return event, None
 
-        if not self.config.get('exh', True):
+        if not self.settings.exh:
             message = 'The EXH is disabled and the age is not appropriate'
             self._add_issue("age_exh", message, level="error")
             raise IncorrectAge(message)
 
-        event = events[0]
-        if len(events) > 1:
-            logger.warning(
-                f'[{self.i}]: Было найдено несколько одинаковых дистанций для EXH')
+        if len(ages.candidates) > 1:
+            rowlog.warning(
+                'exh', '[{}]: Было найдено несколько одинаковых дистанций для EXH', self.i)
 
-        logger.warning(
-            f'[{self.i}]: {self.athlete.firstname} {self.athlete.lastname} {get_age(self.athlete)}, участвует в забеге со статусом EXH, потому что он не подходит для возраста ({event[0][0]}-{event[0][1]})')
+        rowlog.warning(
+            'exh', '[{}]: {} {} {}, участвует в забеге со статусом EXH, потому что он не подходит для возраста ({}-{})',
+            self.i, self.row.firstname, self.row.lastname, age, min, max)
         self._add_issue(
             "age_exh",
-            f"{self.athlete.firstname} {self.athlete.lastname} {get_age(self.athlete)}: статус EXH (возраст {event[0][0]}-{event[0][1]})",
-            extra={"age": get_age(self.athlete), "allowed": f"{event[0][0]}-{event[0][1]}"},
-        )
-        return event[1], EntryStatus.EXH
-
-    def validate_entrytime(self):
-        if self.row.entrytime.isoformat() == '00:00:00':
-            return self.row.entrytime
-        if not self.config['points']['enabled']:
-            return self.row.entrytime
-
-        point = bt.get_point(
-            self.lenex.meet.course,
-            self.athlete.gender,
-            self.row.distance,
-            self.stroke,
-            get_only_time(self.row.entrytime)
-        )
-        if self.config['points']['max'] > point > self.config['points']['min']:
-            return self.row.entrytime
-        logger.warning(
-            f'[{self.i}]: Нарушение политики очков ({point:.5f};{self.row.entrytime})')
-        self._add_issue(
-            "points_policy",
-            f'Нарушение политики очков ({point:.5f};{self.row.entrytime})',
-            extra={"points": round(point, 5), "entrytime": str(self.row.entrytime)},
+            f"{self.row.firstname} {self.row.lastname} {age}: статус EXH (возраст {min}-{max})",
+            extra={"age": age, "allowed": f"{min}-{max}"},
         )
-        return time()
+        return event, EntryStatus.EXH
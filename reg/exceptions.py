@@ -1,7 +1,12 @@
 
 
 class RegisteredError(Exception):
-    pass
+    value = None
+
+    def __reduce__(self):
+        # The message is formatted from a single value in __init__, so
+        # rebuild from that value when crossing process boundaries.
+        return type(self), (self.value,)
 
 
 class IncorrectError(RegisteredError, ValueError):
@@ -10,19 +15,29 @@ class IncorrectError(RegisteredError, ValueError):
 
 class IncorrectDistance(IncorrectError):
     def __init__(self, value: str):
+        self.value = value
         super().__init__(f'No distances found by parameters {value}')
 
 
 class IncorrectGender(IncorrectError):
     def __init__(self, value: str):
+        self.value = value
         super().__init__(f'There is no gender for the value of {value}')
 
 
 class IncorrectAge(IncorrectError):
     def __init__(self, value: str):
+        self.value = value
         super().__init__(f'There is no birthday for the value of {value}')
 
 
+class MissingBaseTime(RegisteredError, LookupError):
+    def __init__(self, value: tuple):
+        self.value = value
+        super().__init__(f'No base time for {" ".join(map(str, value))}')
+
+
 class ParseError(RegisteredError):
     def __init__(self, row: int):
+        self.value = row
         super().__init__(f'An error occurred in row {row}')
@@ -0,0 +1,42 @@
+from lenexpy.models.lenex import Lenex
+from lenexpy.models.event import Event
+from lenexpy.models.heat import Heat, StatusHeat
+from reg.ids import IdAllocator, SequentialIdAllocator
+
+
+class HeatRegistry:
+    """Heats created during one translation run.
+
+    Keyed by (eventid, gender, heat number). Heat ids already present in the
+    meet are reserved in the allocator, so new ids collide neither with
+    existing heats nor with each other.
+    """
+
+    def __init__(self, lenex: Lenex, ids: IdAllocator | None = None):
+        self.heats: dict[tuple, int] = {}
+        self.ids = ids or SequentialIdAllocator(1000)
+        self.ids.reserve('heat', (
+            heat.heatid
+            for session in lenex.meet.sessions
+            for event in session.events
+            for heat in event.heats or ()
+        ))
+
+    def get(self, event: Event, gender: str, number: int) -> int:
+        key = (event.eventid, gender, number)
+        if (heatid := self.heats.get(key)) is None:
+            heatid = self.ids.allocate('heat', *key)
+            self.heats[key] = heatid
+            heat = Heat(
+                heatid=heatid,
+                number=number,
+                order=number,
+                status=StatusHeat.SEEDED
+            )
+            if not event.heats:
+                event.heats = []
+            event.heats.append(heat)
+        return heatid
+
+    def clear(self):
+        self.heats.clear()
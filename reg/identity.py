@@ -0,0 +1,75 @@
+from datetime import date
+from difflib import SequenceMatcher
+from lenexpy.models.athelete import Athlete
+
+
+def normalize_name(value) -> str:
+    """Casefolded, ё -> е, whitespace collapsed; empty for missing values."""
+    if not value:
+        return ''
+    return ' '.join(str(value).casefold().replace('ё', 'е').split())
+
+
+class AthleteIndex:
+    """Athletes by normalised identity.
+
+    The key is (birthdate, gender, lastname, firstname, middlename) with
+    the names passed through normalize_name(), so case, ё/е and stray
+    spaces don't split one athlete in two. Exact keys are a dict lookup.
+    With ``fuzzy`` on, a miss is compared by name similarity against the
+    athletes sharing its (birthdate, gender) block only, which keeps the
+    index near-linear however many athletes there are.
+    """
+
+    def __init__(self, fuzzy: bool = False, threshold: float = 0.9):
+        self.fuzzy = fuzzy
+        self.threshold = threshold
+        self.athletes: dict[tuple, Athlete] = {}
+        self.blocks: dict[tuple, list[tuple[str, tuple]]] = {}
+        # Keys fuzzy-matched before, so each variant is compared only once
+        self.aliases: dict[tuple, tuple[Athlete, float]] = {}
+
+    def __len__(self):
+        return len(self.athletes)
+
+    def values(self):
+        return self.athletes.values()
+
+    @staticmethod
+    def key(birthdate: date, gender: str, lastname, firstname, middlename) -> tuple:
+        return (birthdate, gender, normalize_name(lastname),
+                normalize_name(firstname), normalize_name(middlename))
+
+    def find(self, key: tuple) -> tuple[Athlete | None, float]:
+        """The athlete for ``key`` and the name similarity it was found by."""
+        if (athlete := self.athletes.get(key)) is not None:
+            return athlete, 1.0
+        if not self.fuzzy:
+            return None, 0.0
+        if (alias := self.aliases.get(key)) is not None:
+            return alias
+
+        name = ' '.join(key[2:])
+        size = len(name)
+        matcher = None
+        best, best_ratio = None, self.threshold
+        for other_name, other in self.blocks.get(key[:2], ()):
+            # Upper bound of ratio() from the lengths alone
+            total = size + len(other_name)
+            if not total or 2 * min(size, len(other_name)) < best_ratio * total:
+                continue
+            if matcher is None:
+                matcher = SequenceMatcher(None, '', name)
+            matcher.set_seq1(other_name)
+            if (matcher.quick_ratio() >= best_ratio
+                    and (ratio := matcher.ratio()) >= best_ratio):
+                best, best_ratio = other, ratio
+        if best is None:
+            return None, 0.0
+        alias = self.aliases[key] = (self.athletes[best], best_ratio)
+        return alias
+
+    def add(self, key: tuple, athlete: Athlete):
+        self.athletes[key] = athlete
+        if self.fuzzy:
+            self.blocks.setdefault(key[:2], []).append((' '.join(key[2:]), key))
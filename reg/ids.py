@@ -0,0 +1,77 @@
+from abc import ABC, abstractmethod
+from hashlib import blake2b
+
+
+class IdAllocator(ABC):
+    """Hands out unique integer ids per kind ("athlete", "heat", ...).
+
+    Ids already present in the source file can be reserved up front, so
+    allocated ids never collide with them or with each other.
+    """
+
+    def __init__(self):
+        self.used: dict[str, set[int]] = {}
+
+    def reserve(self, kind: str, ids):
+        self.used.setdefault(kind, set()).update(ids)
+
+    def _take(self, kind: str, candidate: int) -> bool:
+        used = self.used.setdefault(kind, set())
+        if candidate in used:
+            return False
+        used.add(candidate)
+        return True
+
+    @abstractmethod
+    def allocate(self, kind: str, *key) -> int:
+        """A free id for the object identified by ``key``."""
+
+
+class SequentialIdAllocator(IdAllocator):
+    """1, 2, 3, ... per kind, skipping reserved ids."""
+
+    def __init__(self, start: int = 1):
+        super().__init__()
+        self.start = start
+        self.counters: dict[str, int] = {}
+
+    def allocate(self, kind: str, *key) -> int:
+        candidate = self.counters.get(kind, self.start)
+        while not self._take(kind, candidate):
+            candidate += 1
+        self.counters[kind] = candidate + 1
+        return candidate
+
+
+class StableHashIdAllocator(IdAllocator):
+    """Ids derived from a seeded hash of the object key.
+
+    The same key gets the same id across runs and across unrelated changes
+    in the sheet; collisions are resolved by probing upwards.
+    """
+
+    def __init__(self, seed: str = '', low: int = 100_000, high: int = 1_000_000):
+        super().__init__()
+        self.seed = seed
+        self.low = low
+        self.span = high - low
+
+    def allocate(self, kind: str, *key) -> int:
+        raw = '\x1f'.join(map(str, (self.seed, kind) + key)).encode()
+        offset = int.from_bytes(blake2b(raw, digest_size=8).digest(), 'big')
+        for probe in range(self.span):
+            candidate = self.low + (offset + probe) % self.span
+            if self._take(kind, candidate):
+                return candidate
+        raise OverflowError(f'No free {kind} ids left in [{self.low}, {self.low + self.span})')
+
+
+allocators = {
+    'sequential': lambda cfg: SequentialIdAllocator(cfg.get('start', 1)),
+    'hash': lambda cfg: StableHashIdAllocator(str(cfg.get('seed', ''))),
+}
+
+
+def get_allocator(config: dict) -> IdAllocator:
+    ids = config.get('ids', {})
+    return allocators[ids.get('mode', 'sequential')](ids)
@@ -0,0 +1,160 @@
+from bisect import bisect_left
+import contextlib
+import re
+
+_number = re.compile(r'\d+(?:[.,:]\d+)*')
+
+# Extra fields that split a category further than its message template
+KEY_FIELDS: dict[str, tuple[str, ...]] = {
+    "incorrect_distance": ("gender", "stroke", "distance"),
+    "age_exh": ("allowed",),
+    "duplicate_entry": ("eventid",),
+}
+
+# Categories whose messages name the athlete are grouped by these
+# name-free templates, filled from the issue's extra
+TEMPLATES: dict[str, str] = {
+    "age_exh": "Статус EXH (возраст {allowed})",
+    "duplicate_entry": "Дублированные записи, дистанция {eventid}",
+    "athlete_merged": "Спортсмены объединены по сходству",
+}
+
+
+def message_template(message: str) -> str:
+    """The message with numbers, times and dates replaced by ``#``."""
+    return _number.sub('#', message)
+
+
+def group_template(category: str, message: str, extra: dict) -> str:
+    """TEMPLATES entry of the category if the extra fills it, else the
+    message template."""
+    if (template := TEMPLATES.get(category)) is not None:
+        with contextlib.suppress(KeyError):
+            return template.format_map(extra)
+    return message_template(message)
+
+
+def format_ranges(ranges: list[list[int]], limit: int | None = None) -> str:
+    text = ', '.join(str(a) if a == b else f'{a}-{b}' for a, b in ranges[:limit])
+    if limit is not None and len(ranges) > limit:
+        text += f' … (+{len(ranges) - limit})'
+    return text
+
+
+class IssueGroup:
+    """Issues sharing a category, message template and key fields."""
+    __slots__ = ('category', 'template', 'key', 'level', 'message', 'uniform',
+                 'count', 'ranges')
+
+    def __init__(self, category: str, template: str, key: dict, level: str, message: str):
+        self.category = category
+        self.template = template
+        self.key = key
+        self.level = level
+        # First message of the group and whether all the others match it
+        self.message = message
+        self.uniform = True
+        self.count = 0
+        # Sorted, non-adjacent [first, last] row spans
+        self.ranges: list[list[int]] = []
+
+    def __repr__(self):
+        return f'<IssueGroup {self.category} x{self.count} {self.label!r}>'
+
+    @property
+    def label(self) -> str:
+        return self.message if self.uniform else self.template
+
+    @property
+    def rows(self) -> str:
+        return format_ranges(self.ranges)
+
+    def add(self, message: str, level: str, row_index: int | None):
+        self.count += 1
+        if self.uniform and message != self.message:
+            self.uniform = False
+        if level == "error":
+            self.level = level
+        if row_index is not None:
+            self._add_row(row_index)
+
+    def remove(self, row_index: int | None):
+        """Undo add() for one issue. ``message`` and ``uniform`` keep
+        describing the issues seen so far."""
+        self.count -= 1
+        if row_index is not None:
+            self._remove_row(row_index)
+
+    def _add_row(self, i: int):
+        ranges = self.ranges
+        # Rows mostly arrive in order: extend or append at the end
+        if not ranges or i > ranges[-1][1] + 1:
+            ranges.append([i, i])
+            return
+        if i == ranges[-1][1] + 1:
+            ranges[-1][1] = i
+            return
+        k = bisect_left(ranges, i - 1, key=lambda r: r[1])
+        span = ranges[k]
+        if span[0] > i + 1:
+            ranges.insert(k, [i, i])
+            return
+        span[0], span[1] = min(span[0], i), max(span[1], i)
+        if k + 1 < len(ranges) and ranges[k + 1][0] <= span[1] + 1:
+            span[1] = ranges.pop(k + 1)[1]
+
+    def _remove_row(self, i: int):
+        ranges = self.ranges
+        k = bisect_left(ranges, i, key=lambda r: r[1])
+        if k == len(ranges) or ranges[k][0] > i:
+            return
+        span = ranges[k]
+        if span[0] == span[1]:
+            del ranges[k]
+        elif i == span[0]:
+            span[0] = i + 1
+        elif i == span[1]:
+            span[1] = i - 1
+        else:
+            ranges.insert(k + 1, [i + 1, span[1]])
+            span[1] = i - 1
+
+
+class IssueGroups:
+    """Issues grouped as they are added; see IssueGroup."""
+
+    def __init__(self):
+        self.groups: dict[tuple, IssueGroup] = {}
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __iter__(self):
+        return iter(self.groups.values())
+
+    @staticmethod
+    def _key(category: str, message: str, extra: dict) -> tuple:
+        fields = KEY_FIELDS.get(category, ())
+        return category, group_template(category, message, extra), tuple(str(extra.get(f)) for f in fields)
+
+    def add(self, category: str, message: str, level: str, row_index: int | None, extra: dict):
+        key = self._key(category, message, extra)
+        group = self.groups.get(key)
+        if group is None:
+            category, template, values = key
+            fields = KEY_FIELDS.get(category, ())
+            group = self.groups[key] = IssueGroup(
+                category, template, dict(zip(fields, values)), level, message)
+        group.add(message, level, row_index)
+
+    def remove(self, category: str, message: str, level: str, row_index: int | None, extra: dict):
+        """Undo add() for one issue; groups left empty are dropped."""
+        key = self._key(category, message, extra)
+        if (group := self.groups.get(key)) is None:
+            return
+        group.remove(row_index)
+        if not group.count:
+            del self.groups[key]
+
+    def largest(self) -> list[IssueGroup]:
+        return sorted(self.groups.values(), key=lambda g: -g.count)
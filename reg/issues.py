@@ -1,8 +1,269 @@
+import json
+import os
+from pathlib import Path
+import sqlite3
+import tempfile
+import threading
+from typing import Iterator
+import weakref
+from loguru import logger
+from reg.issue_groups import IssueGroups
+
+
+class Issue:
+    """One parser issue.
+
+    Keeps a reference to the (immutable) row instead of its repr and field
+    dict; both are built on first access, which for most issues is never.
+    """
+    __slots__ = ('category', 'message', 'level', 'row_index', 'row', '_extra',
+                 '_row_repr', '_row_data')
+
+    def __init__(
+        self,
+        category: str,
+        message: str,
+        level: str = "warning",
+        row_index: int | None = None,
+        row=None,
+        row_repr: str | None = None,
+        row_data: dict | None = None,
+        extra: dict | None = None,
+    ):
+        self.category = category
+        self.message = message
+        self.level = level
+        self.row_index = row_index
+        self.row = row
+        self._extra = extra or {}
+        self._row_repr = row_repr
+        self._row_data = row_data
+
+    def __repr__(self):
+        return f'<Issue {self.category} row={self.row_index} {self.message!r}>'
+
+    @property
+    def extra(self) -> dict:
+        if isinstance(self._extra, str):
+            self._extra = json.loads(self._extra)
+        return self._extra
+
+    @property
+    def row_repr(self) -> str | None:
+        if self._row_repr is None and self.row is not None:
+            self._row_repr = repr(self.row)
+        return self._row_repr
+
+    @property
+    def row_data(self) -> dict | None:
+        if self._row_data is None and hasattr(self.row, '_serialize_row'):
+            self._row_data = self.row._serialize_row()
+        elif isinstance(self._row_data, str):
+            # Read back from the store, still JSON
+            self._row_data = json.loads(self._row_data)
+        return self._row_data
+
+
+def _sort_key(item: Issue):
+    return item.row_index is None, item.row_index or 0
+
+
+def _dumps(value) -> str | None:
+    return None if value is None else json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _close(db: sqlite3.Connection, path: Path):
+    db.close()
+    path.unlink(missing_ok=True)
+
+
+class IssueStore:
+    """Issue storage that moves to a SQLite file past ``threshold`` issues.
+
+    Below the threshold issues are plain objects in a list with a
+    per-category index. Once it is exceeded they are written to a temporary
+    database and only a small insert buffer stays in memory, so memory use
+    is bounded however many issues a run produces. Spilled issues come back
+    with their row repr and data already serialised; data and extra are
+    decoded on first access.
+
+    Access from the GUI thread while the worker adds issues is serialised
+    by a lock.
+    """
+
+    buffer_size = 1000
+
+    def __init__(self, threshold: int = 20_000, directory: str | Path | None = None):
+        self.threshold = threshold
+        self.directory = directory
+        self.memory: list[Issue] = []
+        self.index: dict[str, list[Issue]] = {}
+        self.db: sqlite3.Connection | None = None
+        self.path: Path | None = None
+        self.buffer: list[tuple] = []
+        self.seq = 0
+        self.lock = threading.RLock()
+
+    @property
+    def spilled(self) -> bool:
+        return self.db is not None
+
+    def _record(self, issue: Issue) -> tuple:
+        self.seq += 1
+        return (self.seq, issue.category, issue.message, issue.level, issue.row_index,
+                issue.row_repr, _dumps(issue.row_data), _dumps(issue.extra))
+
+    def _spill(self):
+        fd, path = tempfile.mkstemp(prefix='issues-', suffix='.sqlite3', dir=self.directory)
+        os.close(fd)
+        self.path = Path(path)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self._finalizer = weakref.finalize(self, _close, self.db, self.path)
+        self.db.executescript('''
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE issues (
+                seq INTEGER NOT NULL, category TEXT NOT NULL, message TEXT NOT NULL,
+                level TEXT NOT NULL, row_index INTEGER, row_repr TEXT,
+                row_data TEXT, extra TEXT
+            );
+            CREATE INDEX issues_seq ON issues (seq);
+            CREATE INDEX issues_category ON issues (category, seq);
+        ''')
+        logger.info(f'[Issues] Больше {self.threshold} замечаний, сохраняются в {path}')
+        self.buffer = [self._record(issue) for issue in self.memory]
+        self.memory, self.index = [], {}
+        self._flush()
+
+    def _flush(self):
+        if self.buffer:
+            self.db.executemany('INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?)', self.buffer)
+            self.db.commit()
+            self.buffer = []
+
+    def add(self, issue: Issue):
+        with self.lock:
+            if self.db is None:
+                self.memory.append(issue)
+                self.index.setdefault(issue.category, []).append(issue)
+                if len(self.memory) > self.threshold:
+                    self._spill()
+            else:
+                self.buffer.append(self._record(issue))
+                if len(self.buffer) >= self.buffer_size:
+                    self._flush()
+
+    def remove(self, category: str, rows: set[int]):
+        """Drop the issues of ``category`` on the given rows."""
+        with self.lock:
+            if self.db is None:
+                if not (items := self.index.get(category)):
+                    return
+                if kept := [item for item in items if item.row_index not in rows]:
+                    self.index[category] = kept
+                else:
+                    del self.index[category]
+                self.memory = [item for item in self.memory
+                               if item.category != category or item.row_index not in rows]
+                return
+            self._flush()
+            rows = list(rows)
+            # Under SQLite's default limit of 999 host parameters
+            for k in range(0, len(rows), 500):
+                chunk = rows[k:k + 500]
+                self.db.execute(
+                    f'DELETE FROM issues WHERE category = ? AND row_index IN ({", ".join("?" * len(chunk))})',
+                    (category, *chunk))
+            self.db.commit()
+
+    def sort(self):
+        """Restore run order: by row, run-level issues (no row) last."""
+        with self.lock:
+            if self.db is None:
+                self.memory.sort(key=_sort_key)
+                self.index = {}
+                for item in self.memory:
+                    self.index.setdefault(item.category, []).append(item)
+                return
+            self._flush()
+            self.db.execute('''
+                UPDATE issues SET seq = (
+                    SELECT n FROM (
+                        SELECT rowid AS id, ROW_NUMBER() OVER (
+                            ORDER BY row_index IS NULL, row_index, seq) AS n
+                        FROM issues
+                    ) AS ranked WHERE ranked.id = issues.rowid
+                )
+            ''')
+            self.seq = self.db.execute('SELECT COUNT(*) FROM issues').fetchone()[0]
+            self.db.commit()
+
+    def count(self, category: str | None = None) -> int:
+        with self.lock:
+            if self.db is None:
+                if category is None:
+                    return len(self.memory)
+                return len(self.index.get(category, ()))
+            self._flush()
+            if category is None:
+                return self.db.execute('SELECT COUNT(*) FROM issues').fetchone()[0]
+            return self.db.execute(
+                'SELECT COUNT(*) FROM issues WHERE category = ?', (category,)).fetchone()[0]
+
+    def categories(self) -> dict[str, int]:
+        """Issue count per category, in order of first appearance."""
+        with self.lock:
+            if self.db is None:
+                return {category: len(items) for category, items in self.index.items()}
+            self._flush()
+            return dict(self.db.execute(
+                'SELECT category, COUNT(*) FROM issues GROUP BY category ORDER BY MIN(seq)'))
+
+    def page(self, category: str | None = None, offset: int = 0, limit: int = 200) -> list[Issue]:
+        with self.lock:
+            if self.db is None:
+                items = self.memory if category is None else self.index.get(category, [])
+                return items[offset:offset + limit]
+            self._flush()
+            where, args = ('WHERE category = ?', (category,)) if category is not None else ('', ())
+            rows = self.db.execute(
+                f'SELECT category, message, level, row_index, row_repr, row_data, extra '
+                f'FROM issues {where} ORDER BY seq LIMIT ? OFFSET ?',
+                args + (limit, offset))
+            return [
+                Issue(category, message, level, row_index, None,
+                      row_repr, row_data, extra)
+                for category, message, level, row_index, row_repr, row_data, extra in rows
+            ]
+
+    def iter(self, category: str | None = None, page_size: int = 1000) -> Iterator[Issue]:
+        offset = 0
+        while page := self.page(category, offset, page_size):
+            yield from page
+            offset += len(page)
+
+    def close(self):
+        with self.lock:
+            if self.db is not None:
+                self._finalizer()
+                self.db = None
+
+
 class IssueCollector:
-    """In-memory accumulator for parser issues."""
+    """Accumulator for parser issues on top of an IssueStore.
+
+    Issues are also grouped as they come in (``groups``), so reports can
+    show counted groups instead of every single issue.
+    """
 
-    def __init__(self):
-        self.items: list[dict] = []
+    def __init__(self, store: IssueStore | None = None):
+        self.store = store or IssueStore()
+        self.groups = IssueGroups()
+
+    @property
+    def items(self) -> list[Issue]:
+        """All issues; reads spilled ones back, prefer page() for large runs."""
+        return list(self.store.iter())
 
     def add(
         self,
@@ -13,24 +274,45 @@ class IssueCollector:
         row_repr: str | None = None,
         row_data: dict | None = None,
         extra: dict | None = None,
+        row=None,
     ):
-        self.items.append(
-            {
-                "category": category,
-                "message": message,
-                "level": level,
-                "row_index": row_index,
-                "row_repr": row_repr,
-                "row_data": row_data,
-                "extra": extra or {},
-            }
-        )
-
-    def by_category(self) -> dict[str, list[dict]]:
-        grouped: dict[str, list[dict]] = {}
-        for item in self.items:
-            grouped.setdefault(item["category"], []).append(item)
-        return grouped
+        issue = Issue(category, message, level, row_index, row, row_repr, row_data, extra)
+        self.store.add(issue)
+        self.groups.add(category, message, level, row_index, issue.extra)
+
+    def remove(self, category: str, issues: list[tuple]):
+        """Drop single issues, given as (row_index, message, level, extra),
+        at most one of ``category`` per row."""
+        if not issues:
+            return
+        self.store.remove(category, {row_index for row_index, *_ in issues})
+        for row_index, message, level, extra in issues:
+            self.groups.remove(category, message, level, row_index, extra)
+
+    def sort(self):
+        self.store.sort()
+
+    def count(self, category: str | None = None) -> int:
+        return self.store.count(category)
+
+    def categories(self) -> dict[str, int]:
+        return self.store.categories()
+
+    def page(self, category: str | None = None, offset: int = 0, limit: int = 200) -> list[Issue]:
+        return self.store.page(category, offset, limit)
+
+    def by_category(self) -> dict[str, list[Issue]]:
+        if not self.store.spilled:
+            return self.store.index
+        return {category: list(self.store.iter(category)) for category in self.categories()}
 
     def has_items(self) -> bool:
-        return bool(self.items)
+        return self.store.count() > 0
+
+
+def get_issue_collector(config: dict) -> IssueCollector:
+    issues = config.get('issues', {})
+    return IssueCollector(IssueStore(
+        int(issues.get('spill_after', 20_000)),
+        issues.get('dir') or None,
+    ))
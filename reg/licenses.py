@@ -0,0 +1,35 @@
+class LicenseNormalizer:
+    """``config['replacement']`` compiled for license lookups.
+
+    The rules are applied in table order, each to the result of the
+    previous one, exactly like the original sequential ``str.replace``
+    passes: the shipped table depends on that order. Results are memoised
+    per raw value, so the rules run once per distinct value; licenses are
+    checked by set membership.
+    """
+
+    def __init__(self, replacement: dict[str, str], licenses):
+        self.rules = tuple((a, b) for a, b in replacement.items() if a)
+        self.licenses = frozenset(licenses)
+        self.cache: dict[str, str | None] = {}
+        self.hits = 0
+
+    def normalize(self, license: str) -> str:
+        # Everything but the roman "I" is case-insensitive.
+        license = 'I'.join(part.lower() for part in license.split('I'))
+        for a, b in self.rules:
+            license = license.replace(a, b)
+        return license
+
+    def get(self, license: str) -> str | None:
+        """Normalised license, or None if it is not one of the known ones."""
+        try:
+            result = self.cache[license]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return result
+        normalized = self.normalize(license)
+        result = self.cache[license] = normalized if normalized in self.licenses else None
+        return result
@@ -0,0 +1,109 @@
+import traceback
+from loguru import logger
+
+
+class RowLog:
+    """Rate-limited logging for messages repeated per row.
+
+    Messages are loguru templates with positional arguments, so nothing is
+    formatted unless a sink takes the level. Each category is logged at
+    most ``limit`` times per run (0 means no limit), the rest are only
+    counted and summarised by summary(). Exception tracebacks go out at
+    DEBUG level only.
+
+    Worker processes keep their own counts; the parent adds them up with
+    merge(drain()) so the summary covers the whole run. Their messages
+    travel the same way, see capture() and replay().
+    """
+
+    def __init__(self, limit: int = 0):
+        self.limit = limit
+        # category -> [seen, logged]
+        self.counts: dict[str, list[int]] = {}
+        self.drained: dict[str, tuple[int, int]] = {}
+
+    def reset(self, limit: int):
+        self.limit = limit
+        self.counts = {}
+        self.drained = {}
+
+    def _allow(self, category: str) -> bool:
+        counts = self.counts.get(category)
+        if counts is None:
+            counts = self.counts[category] = [0, 0]
+        counts[0] += 1
+        if self.limit and counts[1] >= self.limit:
+            return False
+        counts[1] += 1
+        return True
+
+    def info(self, category: str, message: str, *args):
+        if self._allow(category):
+            logger.opt(depth=1).info(message, *args)
+
+    def warning(self, category: str, message: str, *args):
+        if self._allow(category):
+            logger.opt(depth=1).warning(message, *args)
+
+    def error(self, category: str, message: str, *args, exc: BaseException | None = None):
+        if self._allow(category):
+            logger.opt(depth=1).error(message, *args)
+            if exc is not None:
+                logger.opt(depth=1, exception=exc).debug('Трассировка: ' + message, *args)
+
+    def drain(self) -> dict[str, tuple[int, int]]:
+        """Counts added since the last drain()."""
+        delta = {}
+        for category, (seen, logged) in self.counts.items():
+            old_seen, old_logged = self.drained.get(category, (0, 0))
+            if seen != old_seen:
+                delta[category] = (seen - old_seen, logged - old_logged)
+            self.drained[category] = (seen, logged)
+        return delta
+
+    def merge(self, counts: dict[str, tuple[int, int]]):
+        for category, (seen, logged) in counts.items():
+            own = self.counts.setdefault(category, [0, 0])
+            own[0] += seen
+            own[1] += logged
+
+    def summary(self):
+        """Log what was held back and start counting anew."""
+        for category, (seen, logged) in self.counts.items():
+            if seen > logged:
+                logger.info(f'[Log] {category}: {seen} сообщений, скрыто {seen - logged}')
+        self.counts = {}
+        self.drained = {}
+
+
+rowlog = RowLog()
+
+
+def capture(level: str) -> list[tuple]:
+    """Send this process's log records to a list instead of its sinks.
+
+    For worker processes: spawned ones (Windows) never run start.py's sink
+    setup, and forked ones would write to the parent's files concurrently.
+    The parent re-emits the list with replay(), in row order.
+    """
+    records = []
+
+    def sink(message):
+        record = message.record
+        text = record['message']
+        if record['exception'] is not None:
+            text += '\n' + ''.join(traceback.format_exception(*record['exception'])).rstrip()
+        records.append((record['level'].name, text, record['name'], record['function'],
+                        record['line'], record['module'], record['file'], record['time']))
+
+    logger.remove()
+    logger.add(sink, level=level, format='{message}')
+    return records
+
+
+def replay(records: list[tuple]):
+    """Log records collected by capture() as if they were logged here."""
+    for level, text, name, function, line, module, file, time in records:
+        logger.patch(lambda r: r.update(
+            name=name, function=function, line=line, module=module, file=file, time=time,
+        )).log(level, text)
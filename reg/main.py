@@ -1,14 +1,26 @@
 from lenexpy import fromfile
 from lenexpy.models.lenex import Lenex
 from loguru import logger
-import openpyxl
 from reg.athlete_parser import BaseData
-from reg.event_parser import RowParser
-from reg.row_types import Row, RowValidate
-from reg.issues import IssueCollector
-from reg.exceptions import IncorrectAge, IncorrectDistance
+from reg.cache import get_workbook_cache
+from reg.duplicates import find_duplicates, keep_fastest
+from reg.event_parser import RowParser, RowRecord, decode_rows, match_rows, reapply_points
+from reg.event_index import EventIndex
+from reg.heats import HeatRegistry
+from reg.ids import IdAllocator, get_allocator
+from reg.points import score_records
+from reg.profiling import RunProfiler
+from reg.parallel import CHUNK_SIZE, analyze_parallel, get_workers
+from reg.row_timing import RowTimes
+from reg.row_types import RowDecoder
+from reg.settings import Settings
+from reg.stats import RunStats, memo_hits
+from reg.issues import IssueCollector, get_issue_collector
+from reg.logs import rowlog
+from reg.exceptions import IncorrectAge, IncorrectDistance, MissingBaseTime
+from reg.workbook import SheetValues, load_sheet
 import sys
-from lenexpy.ext.basetime import BaseTime
+import time
 
 sys.tracebacklimit = 2
 
@@ -26,69 +38,196 @@ class TranslatorLenex:
         self.lxf_file = lxf_file
         self.xlsx_file = xlsx_file
         self.config = config
-        self.basedata = BaseData(config)
-        self.collector = collector or IssueCollector()
+        # Built per run, so a second parse() allocates the same ids again
+        self.ids: IdAllocator | None = None
+        self.settings: Settings | None = None
+        self.basedata: BaseData | None = None
+        self.collector = collector or get_issue_collector(config)
+        self.lenex: Lenex | None = None
+        # Timings and counters of the last parse()
+        self.stats = RunStats()
+        self.profiler: RunProfiler | None = None
+        # Merged rows of the last run, kept for reapply_points(), plus rows
+        # dropped only for a missing base time (entry None)
+        self.records: list[RowRecord] = []
+
+    def _parse_rows(self, lenex: Lenex, sheet: SheetValues):
+        stats = self.stats
+        hits = memo_hits(self.settings)
+
+        # Rows are pulled from the snapshot as they are decoded; the header
+        # is not an entry and blank rows are skipped, so this is an upper bound
+        chunks = -(-(len(sheet) - 1) // CHUNK_SIZE)
+        workers = min(get_workers(self.config), chunks)
+        with stats.stage('decode'):
+            if (column := self.settings.location['birthday']) != -1:
+                # Detects the column's format and fills the decoder's memo
+                self.settings.birthdates.decode_column(
+                    values[column] if column < len(values) else None
+                    for _, values in sheet.entries())
+            if workers <= 1:
+                records = decode_rows(sheet.entries(), sheet, self.settings,
+                                      RowDecoder(self.settings.location))
+
+        if workers > 1:
+            logger.info(f'Параллельная обработка: {workers} процессов')
+            with stats.stage('parallel'):
+                records = list(analyze_parallel(
+                    sheet.entries(), sheet, self.lxf_file, self.settings,
+                    self.events.reference_date, workers, stats))
+        else:
+            with stats.stage('match'):
+                records = match_rows(records, lenex, self.settings, self.events)
+        stats.count('rows', len(records))
+        for name, n in memo_hits(self.settings).items():
+            stats.count(name, n - hits[name])
+
+        with stats.stage('points'):
+            score_records(records, lenex, self.settings)
+        with stats.stage('merge'):
+            if self.settings.row_timing:
+                for record in records:
+                    start = time.perf_counter()
+                    self._merge(lenex, record)
+                    record.elapsed += time.perf_counter() - start
+            else:
+                for record in records:
+                    self._merge(lenex, record)
+        if self.settings.row_timing:
+            stats.row_times = RowTimes(records, sheet, self.settings.row_timing_top)
+            stats.row_times.log()
+
+    def _merge(self, lenex: Lenex, record: RowRecord):
+        row = record.row
+        try:
+            if row is None:
+                raise record.error
+            RowParser(row, record.i, lenex, self.settings, self.basedata,
+                      collector=self.collector, events=self.events,
+                      heats=self.heats).apply(record)
+            self.records.append(record)
+        except Exception as exc:
+            if isinstance(exc, MissingBaseTime):
+                # Only the points policy rejected it; with the policy off the
+                # row would be merged, so reapply_points() must know about it
+                self.records.append(record)
+            self.stats.count('skipped')
+            rowlog.error('row_error', 'Строка {} пропущена из-за ошибки: [{}] {}',
+                         record.i, type(exc).__name__, exc, exc=exc)
+            # Некоторые ошибки уже сохранены в collector внутри парсера (IncorrectDistance, IncorrectAge)
+            if not isinstance(exc, (IncorrectDistance, IncorrectAge)):
+                category = "parse_error"
+                self.collector.add(
+                    category=category,
+                    message=f"[{type(exc).__name__}] {exc}",
+                    level="error",
+                    row_index=record.i,
+                    row=row,
+                )
+
+    def reapply_points(self) -> bool:
+        """Apply the current config['points'] to the result of the last
+        parse() without re-parsing. Returns False if a full run is needed."""
+        if self.lenex is None:
+            return False
+        self.settings = Settings(self.config)
+        rowlog.reset(self.settings.log_limit)
+        try:
+            return reapply_points(self.records, self.settings, self.collector)
+        finally:
+            rowlog.summary()
 
     def parse(self) -> Lenex:
-        lenex = fromfile(self.lxf_file)
-        workbook = openpyxl.load_workbook(self.xlsx_file)
-        sheet = workbook.active
+        """Run the translation; with config['profile'] on it runs under
+        RunProfiler, kept in ``profiler`` for saving next to the output."""
+        if not self.config.get('profile'):
+            self.profiler = None
+            return self._run()
+        self.profiler = RunProfiler()
+        return self.profiler.run(self._run)
+
+    def _run(self) -> Lenex:
+        stats = self.stats = RunStats()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            return self._parse(stats)
+        finally:
+            stats.wall = time.perf_counter() - wall
+            stats.cpu = time.process_time() - cpu
+            stats.log()
+
+    def _parse(self, stats: RunStats) -> Lenex:
+        self.settings = Settings(self.config)
+        rowlog.reset(self.settings.log_limit)
+        self.ids = get_allocator(self.config)
+        self.basedata = BaseData(self.settings, self.ids)
+        self.records = []
+        with stats.stage('lenex'):
+            lenex = self.lenex = fromfile(self.lxf_file)
+            self.events = EventIndex(lenex)
+            self.heats = HeatRegistry(lenex, self.ids)
+        with stats.stage('workbook'):
+            cache = get_workbook_cache(self.config)
+            sheet = load_sheet(
+                self.xlsx_file,
+                streaming=self.config.get('streaming', True),
+                cache=cache,
+            )
+        if cache is not None:
+            stats.count('workbook_cache_hits', cache.hits)
 
         logger.info(
             f'Обработка началась {lenex.meet.name}')
 
-        RowValidate._init_config(self.config['location'])
-        for i, r in enumerate(sheet.iter_rows(min_row=2), start=1):
-            values = [v.value for v in r]
-            if values[1] is None:
-                continue
-
-            if self.config.get('debug'):
-                logger.debug(f'Обработка {i} строк: {values}')
-
-            try:
-                row = Row._init_row(sheet, values,  i)
-                RowParser(row, i, lenex, self.config,
-                          self.basedata, collector=self.collector).parse()
-            except Exception as exc:
-                logger.exception(
-                    f"Строка {i} пропущена из-за ошибки: [{type(exc).__name__}] {exc}")
-                # Некоторые ошибки уже сохранены в collector внутри парсера (IncorrectDistance, IncorrectAge)
-                if not isinstance(exc, (IncorrectDistance, IncorrectAge)):
-                    category = "parse_error"
-                    self.collector.add(
-                        category=category,
-                        message=f"[{type(exc).__name__}] {exc}",
-                        level="error",
-                        row_index=i,
-                        row_repr=repr(row) if 'row' in locals() else None,
-                        row_data=row._serialize_row() if 'row' in locals() and hasattr(row, '_serialize_row') else None,
-                    )
+        try:
+            self._parse_rows(lenex, sheet)
+        finally:
+            self.heats.clear()
 
         lenex.meet.clubs = list(self.basedata.clubs.values())
+        with stats.stage('duplicates'):
+            self._check_duplicates()
 
-        logger.info(
-            f'[BaseData] Clubs: {len(self.basedata.clubs)} '
-            f'Athletes: {len(self.basedata.athletes)} '
-            f'Entries: {sum([len(athl.entries) for athl in self.basedata.athletes.values()])}'
-        )
-        logger.info(
-            f'[Lenex] Clubs: {len(lenex.meet.clubs)} '
-            f'Athletes: {sum(len(c.athletes) for c in lenex.meet.clubs)} '
-            f'Entries: {sum([len(a.entries) for c in lenex.meet.clubs for a in c.athletes])}'
-        )
-
-        for athl in self.basedata.athletes.values():
-            events = []
-            for ent in athl.entries:
-                if ent.eventid in events:
-                    logger.warning(
-                        f'Дублированные записи: {athl.firstname} {athl.lastname}')
-                    self.collector.add(
-                        category="duplicate_entry",
-                        message=f"Дублированные записи: {athl.firstname} {athl.lastname}",
-                        row_repr=f"{athl.firstname} {athl.lastname}",
-                    )
-                events.append(ent.eventid)
+        with stats.stage('summary'):
+            athletes = sum(len(c.athletes) for c in lenex.meet.clubs)
+            entries = sum([len(a.entries) for c in lenex.meet.clubs for a in c.athletes])
+            logger.info(
+                f'[BaseData] Clubs: {len(self.basedata.clubs)} '
+                f'Athletes: {len(self.basedata.athletes)} '
+                f'Entries: {sum([len(athl.entries) for athl in self.basedata.athletes.values()])}'
+            )
+            logger.info(
+                f'[Lenex] Clubs: {len(lenex.meet.clubs)} '
+                f'Athletes: {athletes} '
+                f'Entries: {entries}'
+            )
+            rowlog.summary()
+        stats.count('clubs', len(lenex.meet.clubs))
+        stats.count('athletes', athletes)
+        stats.count('entries', entries)
+        stats.count('issues', self.collector.count())
 
         return lenex
+
+    def _check_duplicates(self):
+        duplicates = find_duplicates(self.basedata.athletes.values(), self.records)
+        self.stats.count('duplicates', len(duplicates))
+        if duplicates and self.settings.duplicates_resolve:
+            dropped = keep_fastest(duplicates, self.records)
+            logger.info(f'Удалено дублированных записей: {dropped}')
+
+        for duplicate in duplicates:
+            athl = duplicate.athlete
+            rows = ', '.join(str(i) for i in duplicate.rows if i is not None)
+            message = (f"Дублированные записи: {athl.firstname} {athl.lastname}, "
+                       f"дистанция {duplicate.eventid} (строки {rows})")
+            if duplicate.kept is not None:
+                message += f", оставлена строка {duplicate.kept}"
+            rowlog.warning('duplicate_entry', '{}', message)
+            self.collector.add(
+                category="duplicate_entry",
+                message=message,
+                row_repr=f"{athl.firstname} {athl.lastname}",
+                extra={"eventid": duplicate.eventid, "rows": duplicate.rows,
+                       "kept": duplicate.kept},
+            )
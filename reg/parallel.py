@@ -0,0 +1,108 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date
+import os
+from typing import Iterable, Iterator
+from lenexpy import fromfile
+from reg.event_index import EventIndex
+from reg.event_parser import RowRecord, decode_rows, match_rows
+from reg.logs import capture, replay, rowlog
+from reg.row_types import RowDecoder
+from reg.settings import Settings
+from reg.stats import RunStats, memo_hits
+from reg.workbook import SheetValues
+
+CHUNK_SIZE = 1000
+
+_worker: dict = {}
+
+
+def get_workers(config: dict) -> int:
+    """Number of processes for row analysis; 0 means one per CPU."""
+    workers = int(config.get('workers', 1))
+    return workers if workers > 0 else os.cpu_count() or 1
+
+
+def _init_worker(lxf_file: str, settings: Settings, reference_date: date):
+    logs = capture('DEBUG' if settings.debug else 'INFO')
+    lenex = fromfile(lxf_file)
+    rowlog.reset(settings.log_limit)
+    _worker.update(
+        logs=logs,
+        lenex=lenex,
+        settings=settings,
+        events=EventIndex(lenex, reference_date),
+        decoder=RowDecoder(settings.location),
+        hits=memo_hits(settings),
+    )
+
+
+def _analyze_chunk(chunk: list[tuple[int, list]]) -> tuple[list[RowRecord], dict, RunStats, list]:
+    lenex, settings = _worker['lenex'], _worker['settings']
+    stats = RunStats()
+    with stats.stage('decode'):
+        records = decode_rows(chunk, None, settings, _worker['decoder'])
+    with stats.stage('match'):
+        records = match_rows(records, lenex, settings, _worker['events'])
+
+    # Memo hits are cumulative per process; report this chunk's share
+    hits = memo_hits(settings)
+    for name, n in hits.items():
+        stats.count(name, n - _worker['hits'][name])
+    _worker['hits'] = hits
+    logs = _worker['logs'][:]
+    _worker['logs'].clear()
+    return records, rowlog.drain(), stats, logs
+
+
+def _chunks(rows: Iterable[tuple[int, tuple]], sheet: SheetValues) -> Iterator[list[tuple[int, list]]]:
+    chunk = []
+    for i, values in rows:
+        chunk.append((i, sheet.resolve_row(values)))
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _collect(result: tuple[list[RowRecord], dict, RunStats, list], stats: RunStats | None) -> list[RowRecord]:
+    records, log_counts, chunk_stats, logs = result
+    replay(logs)
+    rowlog.merge(log_counts)
+    if stats is not None:
+        stats.merge(chunk_stats)
+    return records
+
+
+def analyze_parallel(
+    rows: Iterable[tuple[int, tuple]],
+    sheet: SheetValues,
+    lxf_file: str,
+    settings: Settings,
+    reference_date: date,
+    workers: int,
+    stats: RunStats | None = None,
+) -> Iterator[RowRecord]:
+    """Analyse rows in worker processes, yielding records in row order.
+
+    Cell references are resolved here, so workers never need the sheet.
+    Workers log into a list that comes back with each chunk and is
+    re-emitted here, so their messages reach the parent's sinks.
+    Chunks are built as the workers take them, at most two per worker
+    ahead. Every worker loads its own copy of the meet; records refer to
+    events by id and are merged by the caller exactly like the sequential
+    ones.
+    """
+    pending: deque[Future] = deque()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(lxf_file, settings, reference_date),
+    ) as pool:
+        for chunk in _chunks(rows, sheet):
+            pending.append(pool.submit(_analyze_chunk, chunk))
+            if len(pending) > 2 * workers:
+                yield from _collect(pending.popleft().result(), stats)
+        while pending:
+            yield from _collect(pending.popleft().result(), stats)
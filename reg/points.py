@@ -0,0 +1,65 @@
+import math
+from lenexpy.models.lenex import Lenex
+from reg.basetimes import BaseTimeTable, get_table
+from reg.event_parser import RowRecord, check_points, get_only_time, warn_points
+from reg.exceptions import MissingBaseTime
+from reg.settings import Settings
+
+
+class PointsEngine:
+    """Batch FINA points, 1000 * (base / time) ** 3, over a base-time table.
+
+    The table is already indexed by integer codes, so a batch is a single
+    pass over (code, seconds) pairs. Unknown keys map to a NaN base time.
+    NumPy is deliberately not used: its power() differs from libm pow() in
+    the last bit for a few percent of inputs, and points must match
+    BaseTimeTable.get_point exactly.
+    """
+
+    def __init__(self, table: BaseTimeTable):
+        self.table = table
+        self.base = table.base
+
+    def code(self, course, gender, distance, stroke) -> int:
+        return self.table.code(course, gender, distance, stroke)
+
+    def compute(self, codes: list[int], seconds: list[float]) -> list[float]:
+        base = self.base
+        return [1000 * (base[c] / s) ** 3 for c, s in zip(codes, seconds)]
+
+
+def score_records(records: list[RowRecord], lenex: Lenex, settings: Settings,
+                  engine: PointsEngine | None = None):
+    """Points and the policy check for analysed records.
+
+    Computes points for every record RowParser.analyze() left unscored in
+    one pass, then runs the policy check per record. A missing base time is
+    an error for the row only while the policy is enabled.
+    """
+    engine = engine or PointsEngine(get_table(settings, lenex))
+    course = lenex.meet.course
+    pending = [
+        r for r in records
+        if r.error is None and r.eventid is not None and r.entrytime is None
+    ]
+    timed = [r for r in pending if r.row.entrytime.isoformat() != '00:00:00']
+    points = engine.compute(
+        [engine.code(course, r.athlete[1], r.row.distance, r.stroke) for r in timed],
+        [get_only_time(r.row.entrytime) for r in timed],
+    )
+    computed = {id(r): p for r, p in zip(timed, points)}
+
+    enabled = settings.points_enabled
+    for record in pending:
+        point = computed.get(id(record))
+        if point is not None and math.isnan(point):
+            if enabled:
+                record.error = MissingBaseTime((str(course), record.athlete[1],
+                                                record.row.distance, record.stroke))
+                continue
+            point = None
+        record.points = point
+        record.entrytime, issue = check_points(record.row.entrytime, point, settings)
+        if issue is not None:
+            record.issues.append(issue)
+            warn_points(record.i, point, record.row.entrytime)
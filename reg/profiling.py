@@ -0,0 +1,82 @@
+import cProfile
+import io
+import marshal
+from pathlib import Path
+import pstats
+from typing import Callable, TypeVar
+from loguru import logger
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+    from pyinstrument.renderers import PstatsRenderer
+except ImportError:
+    SamplingProfiler = None
+
+T = TypeVar('T')
+
+
+class _Rendered:
+    """A pstats dict in the shape pstats.Stats accepts for a profile."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class RunProfiler:
+    """Profile of one call, saved as a pstats dump plus a text summary.
+
+    Uses pyinstrument's sampling profiler when it is installed (much lower
+    overhead on the row loop) and cProfile otherwise. Only the calling
+    thread is profiled, so rows analysed in worker processes show up as
+    time spent waiting for the pool.
+    """
+
+    top = 60
+
+    def __init__(self, sampling: bool = True):
+        self.sampling = sampling and SamplingProfiler is not None
+        self.engine = 'pyinstrument' if self.sampling else 'cProfile'
+        self.stats: pstats.Stats | None = None
+
+    def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        if self.sampling:
+            profiler = SamplingProfiler()
+            profiler.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.stop()
+                # The renderer returns the marshalled dict as text
+                data = profiler.output(PstatsRenderer()).encode('utf-8', 'surrogateescape')
+                self.stats = pstats.Stats(_Rendered(marshal.loads(data)))
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            self.stats = pstats.Stats(profile)
+
+    def summary(self) -> str:
+        stream = io.StringIO()
+        # Stats() empties the profile it loads, so the one from run() is reused
+        stats = self.stats
+        stats.stream = stream
+        stream.write(f'Профилировщик: {self.engine}\n')
+        if self.sampling:
+            stream.write('Выборочный профиль: число вызовов не считается (ncalls = -1)\n')
+        stream.write('\n')
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+        return stream.getvalue()
+
+    def save(self, output: str | Path) -> tuple[Path, Path]:
+        """Write ``<output>.prof`` and ``<output>.prof.txt``."""
+        output = Path(output)
+        dump = output.with_name(output.name + '.prof')
+        text = output.with_name(output.name + '.prof.txt')
+        self.stats.dump_stats(dump)
+        text.write_text(self.summary(), encoding='utf-8')
+        logger.info(f'[Profile] Профиль сохранён: {dump}, {text}')
+        return dump, text
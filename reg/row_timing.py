@@ -0,0 +1,71 @@
+from bisect import bisect_right
+import heapq
+from lenexpy.models.entry import Status as EntryStatus
+from loguru import logger
+from reg.event_parser import RowRecord
+from reg.workbook import SheetValues
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (50e-6, 100e-6, 200e-6, 500e-6, 1e-3, 2e-3, 5e-3, 10e-3, 50e-3)
+
+
+def _label(seconds: float) -> str:
+    return f'{seconds * 1e6:.0f} мкс' if seconds < 1e-3 else f'{seconds * 1e3:.0f} мс'
+
+
+def reasons(record: RowRecord, values: tuple | None) -> str:
+    """What makes a row expensive: 'formula' for ``=A1`` references
+    resolved against the sheet, 'error' for a skipped row, 'exh' for the
+    EXH fallback; 'plain' if none of them."""
+    found = []
+    if values is not None and any(isinstance(v, str) and v.startswith('=') for v in values):
+        found.append('formula')
+    if record.entry is None:
+        found.append('error')
+    if record.status == EntryStatus.EXH:
+        found.append('exh')
+    return '+'.join(found) or 'plain'
+
+
+class RowTimes:
+    """Latency histogram and the slowest rows of one run.
+
+    Built from RowRecord.elapsed (decode, event matching and merge of the
+    row; the batched points stage is not per row), which is only filled in
+    with ``config['row_timing']['enabled']``.
+    """
+
+    def __init__(self, records: list[RowRecord], sheet: SheetValues, top: int = 20):
+        self.count = len(records)
+        self.total = sum(r.elapsed for r in records)
+        self.histogram = [0] * (len(BUCKETS) + 1)
+        for record in records:
+            self.histogram[bisect_right(BUCKETS, record.elapsed)] += 1
+        self.slowest: list[tuple[int, float, str]] = [
+            (r.i, r.elapsed, reasons(r, sheet.entry(r.i)))
+            for r in heapq.nlargest(top, records, key=lambda r: r.elapsed)
+        ]
+
+    def buckets(self) -> list[tuple[str, int]]:
+        labels = [f'< {_label(BUCKETS[0])}']
+        labels += [f'{_label(a)} – {_label(b)}' for a, b in zip(BUCKETS, BUCKETS[1:])]
+        labels.append(f'≥ {_label(BUCKETS[-1])}')
+        return list(zip(labels, self.histogram))
+
+    def as_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'histogram': dict(self.buckets()),
+            'slowest': [{'row': i, 'seconds': s, 'reason': r} for i, s, r in self.slowest],
+        }
+
+    def log(self):
+        mean = self.total / self.count if self.count else 0.0
+        logger.info(f'[RowTiming] Строк {self.count}, всего {self.total * 1000:.1f} мс, '
+                    f'в среднем {_label(mean)}')
+        for label, n in self.buckets():
+            if n:
+                logger.info(f'[RowTiming] {label:>18}: {n}')
+        for i, seconds, reason in self.slowest:
+            logger.info(f'[RowTiming] Строка {i}: {seconds * 1000:.2f} мс ({reason})')
@@ -1,80 +1,36 @@
 from ast import Return
-import contextlib
-from datetime import time, timedelta
-import math
-import re
+from datetime import time
+from operator import itemgetter
 from typing import Callable, Optional
-from loguru import logger
+from reg.entrytime import EntryTimeParser
 
 
 class _MISSINGSlient():
     def __bool__(self):
         return False
 
+    def __reduce__(self):
+        # Unpickle to the module singleton, `is MISSING` checks rely on it.
+        return 'MISSING'
+
 
 MISSING = _MISSINGSlient()
 
 
-def sint(val):
-    return int(val) if val else 0
+entrytime_parser = EntryTimeParser()
 
 
-def parse_entrytime(et: str, index: int):
+def parse_entrytime(et, index: int) -> time:
     if et is MISSING:
         return time()
-    if isinstance(et, float):
-        if math.isnan(et) or et <= 0:
-            return time()
-        minutes = int(et // 60)
-        seconds = int(et % 60)
-        microseconds = round((et - int(et)) * 1_000_000)
-
-        print(et)
-        print(time(0, minutes, seconds, microseconds))
-        return time(0, minutes, seconds, microseconds)
-    if isinstance(et, timedelta):
-        total_seconds = et.total_seconds()
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        return time(00, int(hours), int(minutes),  int(seconds))
-    if isinstance(et, time):
-        return time(
-            0,
-            et.hour,
-            et.minute,
-            et.microsecond
-        )
-
-    et = et.strip()
-    if not et or et.lower() == 'nt':
-        return time()
-    # ((?P<hour>\d{2}):)?
-    match = re.fullmatch(
-        r'((?P<min>\d{1,2})[:\.,])?(?P<sec>\d{1,2})[:\.,](?P<hsec>\d{1,2})', et)
-    if not match:
-        logger.warning(
-            f'[{index}]: Игнорирование времени из-за сбоя обработки ({et})')
-        return time()
-    try:
-        return time(
-            0,
-            sint(match.group('min')),
-            sint(match.group('sec')),
-            sint(match.group('hsec'))*10_000
-        )
-    except Exception as err:
-        logger.warning(
-            f'[{index}]: Игнорирование времени из-за сбоя обработки ({err};{et})')
-        return time()
+    return entrytime_parser.parse(et, index)
 
 
 class RowValidate:
     name: str
     parser: Callable = lambda _, v: v
-    n: int
-    __is_index: bool = False
-    __rows = []
+    slot: int
+    with_index: bool = False
 
     def __init__(
         self,
@@ -86,23 +42,28 @@ class RowValidate:
         self.silent = silent
         if parser is not None:
             if hasattr(parser, '__annotations__') and 'index' in parser.__annotations__:
-                self.__is_index = True
+                self.with_index = True
             self.parser = parser
-        self.__rows.append(self)
+
+    def __set_name__(self, owner, attr):
+        # Fields are stored by position; expose each one the way
+        # namedtuple does and keep the declarations in owner.fields.
+        fields = owner.__dict__.get('fields', ())
+        self.slot = len(fields)
+        owner.fields = fields + (self,)
+        setattr(owner, attr, property(itemgetter(self.slot)))
 
     def _parse_value(self, value, index):
         kwargs = {}
-        if self.__is_index:
+        if self.with_index:
             kwargs['index'] = index
         return self.parser(value, **kwargs)
 
-    @classmethod
-    def _init_config(cls, config: dict[str, int]):
-        for row in cls.__rows:
-            row.n = config[row.name]
 
+class Row(tuple):
+    __slots__ = ()
+    fields: tuple[RowValidate, ...]
 
-class Row:
     lastname: str = RowValidate('lastname')
     firstname: str = RowValidate('firstname')
     gender: str = RowValidate('gender')
@@ -125,30 +86,41 @@ class Row:
         str: lambda _, v: v
     }
 
-    @classmethod
-    def _init_row(cls, sheet, row, index):
-        self = cls()
-        row = list(row)
-
-        for i, v in enumerate(row):
-            if isinstance(v, str) and v.startswith('='):
-                with contextlib.suppress(Exception):
-                    row[i] = sheet[v.removeprefix('=')].value
-
-        for name, item in cls.__dict__.items():
-            if not isinstance(item, RowValidate):
-                continue
-            if item.n == -1:
-                setattr(
-                    self, name, MISSING if not item.silent else item._parse_value(MISSING, index))
-            else:
-                setattr(self, name, item._parse_value(row[item.n], index))
-        return self
+    def _serialize_row(self) -> dict:
+        """Return plain dict of row fields for UI-friendly formatting."""
+        return {field.name: value for field, value in zip(self.fields, self)}
 
     def __repr__(self):
-        values = []
-        for name, item in type(self).__dict__.items():
-            if not isinstance(item, RowValidate):
-                continue
-            values.append(f'{name}={repr(getattr(self, name))}')
-        return f"<Row {' '.join(values)}>"
+        values = ' '.join(
+            f'{field.name}={value!r}' for field, value in zip(self.fields, self))
+        return f"<Row {values}>"
+
+
+class RowDecoder:
+    """Row factory compiled once from the Row fields and a location map.
+
+    Every field becomes a (column, parser, with_index, default) step, so
+    decoding is plain indexing. Unmapped columns (-1) get their value
+    precomputed. Columns past the end of a short row read as None.
+    """
+
+    def __init__(self, location: dict[str, int], row_type: type[Row] = Row):
+        self.row_type = row_type
+        self.steps = []
+        for field in row_type.fields:
+            column = location[field.name]
+            if column == -1:
+                default = field._parse_value(MISSING, 0) if field.silent else MISSING
+                self.steps.append((None, None, False, default))
+            else:
+                self.steps.append((column, field.parser, field.with_index, None))
+
+    def decode(self, values, index: int) -> Row:
+        # Read-only sheets give ragged rows: cells past the end are None
+        n = len(values)
+        return tuple.__new__(self.row_type, [
+            default if column is None
+            else parse(values[column] if column < n else None, index=index) if with_index
+            else parse(values[column] if column < n else None)
+            for column, parse, with_index, default in self.steps
+        ])
@@ -0,0 +1,71 @@
+import copy
+from pathlib import Path
+from types import MappingProxyType
+from reg.birthdates import BirthdateDecoder
+from reg.licenses import LicenseNormalizer
+
+
+class Settings:
+    """Read-only snapshot of the config for one translation run.
+
+    Built once at the start of TranslatorLenex.parse() and handed to every
+    parser component, so edits made in the GUI mid-run don't leak into it
+    and per-row code reads attributes instead of walking nested dicts.
+    Lookup maps are casefolded, the license normalizer is compiled here and
+    the birthdate decoder is set up for the configured format.
+    """
+
+    __slots__ = (
+        '_source', 'debug', 'exh', 'location', 'strokes', 'licenses',
+        'birthdates', 'points_enabled', 'points_min', 'points_max',
+        'basetime_table', 'basetime_dir', 'basetime_meets',
+        'identity_fuzzy', 'identity_threshold', 'duplicates_resolve',
+        'log_limit', 'row_timing', 'row_timing_top',
+    )
+
+    def __init__(self, config: dict):
+        # The GUI keeps the previous result under 'lenex'; it's not a setting.
+        config = copy.deepcopy({k: v for k, v in config.items() if k != 'lenex'})
+        points = config['points']
+        basetime = config.get('basetime', {})
+        identity = config.get('identity', {})
+        row_timing = config.get('row_timing', {})
+        for name, value in (
+            ('_source', config),
+            ('debug', bool(config.get('debug'))),
+            ('exh', bool(config.get('exh', True))),
+            ('location', MappingProxyType(config['location'])),
+            ('strokes', MappingProxyType({
+                k.strip().casefold(): v for k, v in config['reversed_styles'].items()})),
+            ('licenses', LicenseNormalizer(config['replacement'], config['licenses'])),
+            ('birthdates', BirthdateDecoder(config['birthday'])),
+            ('points_enabled', bool(points['enabled'])),
+            ('points_min', points['min']),
+            ('points_max', points['max']),
+            ('basetime_table', basetime.get('table') or None),
+            ('basetime_dir', Path(basetime['dir']) if basetime.get('dir') else None),
+            ('basetime_meets', MappingProxyType(dict(basetime.get('meets', {})))),
+            ('identity_fuzzy', bool(identity.get('fuzzy', False))),
+            ('identity_threshold', float(identity.get('threshold', 0.9))),
+            ('duplicates_resolve', bool(config.get('duplicates', {}).get('resolve', False))),
+            # Per-row messages are not rate-limited in debug mode
+            ('log_limit', 0 if config.get('debug') else int(config.get('logging', {}).get('limit', 20))),
+            ('row_timing', bool(row_timing.get('enabled', False))),
+            ('row_timing_top', int(row_timing.get('top', 20))),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def __reduce__(self):
+        # Worker processes recompile from the plain config; the birthdate
+        # decoder travels as is, with the format detected in the parent.
+        return (type(self), (self._source,), {'birthdates': self.birthdates})
+
+    def __setstate__(self, state: dict):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def stroke(self, name: str) -> str:
+        return self.strokes[name.strip().casefold()]
@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+import time
+from typing import Iterator
+from loguru import logger
+from reg.row_types import entrytime_parser
+from reg.settings import Settings
+
+STAGES = {
+    'lenex': 'Загрузка Lenex',
+    'workbook': 'Загрузка XLSX',
+    'decode': 'Разбор строк',
+    'match': 'Поиск дистанций',
+    'parallel': 'Процессы (ожидание)',
+    'points': 'Очки',
+    'merge': 'Спортсмены, заявки, заплывы',
+    'duplicates': 'Дубликаты',
+    'summary': 'Итоги',
+}
+
+
+class RunStats:
+    """Wall and CPU time per stage plus counters of one parse().
+
+    In a parallel run 'decode' and 'match' are summed over the worker
+    processes (they report their share with every chunk through merge()),
+    while 'parallel' is the wall time the parent spent waiting for them.
+    ``wall``/``cpu`` are the totals of the whole run.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, list[float]] = {}
+        self.counters: dict[str, int] = {}
+        self.wall = 0.0
+        self.cpu = 0.0
+        # reg.row_timing.RowTimes, with config['row_timing'] on
+        self.row_times = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def add_time(self, name: str, wall: float, cpu: float):
+        times = self.stages.setdefault(name, [0.0, 0.0])
+        times[0] += wall
+        times[1] += cpu
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, other: 'RunStats'):
+        for name, (wall, cpu) in other.stages.items():
+            self.add_time(name, wall, cpu)
+        for name, n in other.counters.items():
+            self.count(name, n)
+
+    def as_dict(self) -> dict:
+        return {
+            'wall': self.wall,
+            'cpu': self.cpu,
+            'stages': {name: {'wall': wall, 'cpu': cpu}
+                       for name, (wall, cpu) in self.stages.items()},
+            'counters': dict(self.counters),
+            'rows': self.row_times.as_dict() if self.row_times is not None else None,
+        }
+
+    def log(self):
+        for name, (wall, cpu) in self.stages.items():
+            logger.info(f'[Stats] {STAGES.get(name, name)}: {wall * 1000:.1f} мс (CPU {cpu * 1000:.1f} мс)')
+        counters = ', '.join(f'{name}={n}' for name, n in self.counters.items())
+        logger.info(f'[Stats] Всего {self.wall:.3f} с (CPU {self.cpu:.3f} с); {counters}')
+
+    def banner(self) -> str:
+        rows, skipped = self.counters.get('rows', 0), self.counters.get('skipped', 0)
+        return f'{self.wall:.2f} с · строк {rows} · пропущено {skipped}'
+
+    def details(self) -> str:
+        lines = [f'{STAGES.get(name, name)}: {wall * 1000:.0f} мс (CPU {cpu * 1000:.0f} мс)'
+                 for name, (wall, cpu) in self.stages.items()]
+        lines += [f'{name}: {n}' for name, n in self.counters.items()]
+        return '\n'.join(lines)
+
+
+def memo_hits(settings: Settings) -> dict[str, int]:
+    """Cumulative hits of the per-value memos used while decoding rows."""
+    return {
+        'entrytime_cache_hits': entrytime_parser.hits,
+        'birthdate_cache_hits': settings.birthdates.hits,
+        'license_cache_hits': settings.licenses.hits,
+    }
@@ -0,0 +1,93 @@
+import contextlib
+from typing import Any, Iterator
+import openpyxl
+from openpyxl.utils.cell import coordinate_to_tuple
+from reg.cache import WorkbookCache
+
+
+class SheetValues:
+    """Values-only snapshot of a worksheet.
+
+    Rows are stored as plain tuples (header included), so the workbook can be
+    released right after extraction. ``=A1``-style references are resolved
+    against the snapshot instead of the live sheet, which is why the
+    snapshot itself is kept whole: it is O(rows), everything derived from
+    it is produced row by row. Rows may be ragged; readers bounds-check.
+    """
+
+    def __init__(self, rows: list[tuple]):
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def value(self, coordinate: str) -> Any:
+        row, column = coordinate_to_tuple(coordinate.strip().upper())
+        if row > len(self.rows):
+            return None
+        values = self.rows[row - 1]
+        if column > len(values):
+            return None
+        return values[column - 1]
+
+    def resolve_row(self, values) -> tuple | list:
+        """Replace ``=A1``-style references with the referenced values.
+
+        Rows without references are returned as is, not copied.
+        """
+        resolved = values
+        for i, v in enumerate(values):
+            if isinstance(v, str) and v.startswith('='):
+                if resolved is values:
+                    resolved = list(values)
+                with contextlib.suppress(Exception):
+                    resolved[i] = self.value(v.removeprefix('='))
+        return resolved
+
+    def iter_rows(self, min_row: int = 1) -> Iterator[tuple]:
+        for i in range(min_row - 1, len(self.rows)):
+            yield self.rows[i]
+
+    def entries(self) -> Iterator[tuple[int, tuple]]:
+        """Data rows with a value in the second column, numbered from 1
+        (the first row after the header)."""
+        for i, values in enumerate(self.iter_rows(min_row=2), start=1):
+            if len(values) > 1 and values[1] is not None:
+                yield i, values
+
+    def entry(self, i: int) -> tuple:
+        """Row ``i`` in the numbering of entries()."""
+        return self.rows[i]
+
+
+def load_sheet(
+    path: str,
+    streaming: bool = True,
+    cache: WorkbookCache | None = None,
+) -> SheetValues:
+    """Extract cell values of the active sheet.
+
+    In streaming mode the workbook is opened read-only, rows are pulled as
+    values (no Cell objects) and the file is closed before returning. With
+    a cache, a file seen before is served without touching openpyxl.
+    """
+    if cache is not None:
+        key = cache.key(path)
+        if (rows := cache.get(key)) is not None:
+            return SheetValues(rows)
+
+    workbook = openpyxl.load_workbook(path, read_only=streaming)
+    try:
+        sheet = workbook.active
+        if streaming:
+            # Some generators write a bogus <dimension>, which would cut
+            # the read-only iteration short.
+            sheet.reset_dimensions()
+        # Already tuples; read-only rows may be ragged, RowDecoder pads them
+        rows = list(sheet.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+    if cache is not None:
+        cache.put(key, rows)
+    return SheetValues(rows)
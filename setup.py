@@ -19,7 +19,8 @@ command = f"{venv_python} -m nuitka \
     --onefile \
     --output-dir={dist_dir} \
     --remove-output \
-    --enable-plugin=pyqt6 "
+    --enable-plugin=pyqt6 \
+    --include-data-dir={parent / 'basetimes'}=basetimes "
 
 # Добавляем опцию для скрытия консоли
 if not with_console:
@@ -2,21 +2,31 @@ import json
 import logging
 import traceback
 import contextlib
+import multiprocessing
 import sys
 import os
 
 from loguru import logger
 
 
+def add_sinks(log_file: str, debug: bool):
+    """DEBUG with diagnosed tracebacks when config['debug'] is on; otherwise
+    INFO and plain tracebacks (row tracebacks are DEBUG, so they're skipped)."""
+    logger.remove()
+    log_level = "DEBUG" if debug else "INFO"
+    log_format = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS zz}</green> | <level>{level: <8}</level> | <yellow>Line {line: >4} ({file}):</yellow> <b>{message}</b>"
+    logger.add(sys.stderr, level=log_level, format=log_format, colorize=True, backtrace=debug, diagnose=debug)
+    logger.add(log_file, level=log_level, format=log_format, colorize=False, backtrace=debug, diagnose=debug)
+
+
 def init():
     logging.basicConfig(
         level=logging.DEBUG,
         filename="work.log",
     )
-    log_level = "DEBUG"
-    log_format = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS zz}</green> | <level>{level: <8}</level> | <yellow>Line {line: >4} ({file}):</yellow> <b>{message}</b>"
-    logger.add(sys.stderr, level=log_level, format=log_format, colorize=True, backtrace=True, diagnose=True)
-    logger.add("file.log", level=log_level, format=log_format, colorize=False, backtrace=True, diagnose=True)
+    # Sinks need config['debug'], which is read after the chdir below
+    log_file = os.path.abspath("file.log")
+    add_sinks(log_file, debug=True)
 
     with contextlib.suppress(Exception):
         os.chdir(sys._MEIPASS)
@@ -27,6 +37,7 @@ def init():
 
         with open("config.json", "rb") as file:
             config = json.loads(file.read())
+        add_sinks(log_file, debug=bool(config.get("debug")))
 
         run_app(config)
     except BaseException:
@@ -43,4 +54,6 @@ def init():
 
 
 if __name__ == "__main__":
+    # Needed for the process pool in frozen (nuitka) builds
+    multiprocessing.freeze_support()
     init()
@@ -0,0 +1,85 @@
+from datetime import datetime
+import json
+from pathlib import Path
+import random
+
+import openpyxl
+import pytest
+from lenexpy import tofile
+from lenexpy.models.agegroup import AgeGroup
+from lenexpy.models.constructor import Constructor
+from lenexpy.models.contact import Contact
+from lenexpy.models.event import Event
+from lenexpy.models.lenex import Lenex
+from lenexpy.models.meet import Meet
+from lenexpy.models.session import Session
+from lenexpy.models.swimstyle import SwimStyle
+
+ROOT = Path(__file__).resolve().parent.parent
+STROKES = {'FREE': 'Вольный стиль', 'BACK': 'На спине', 'BREAST': 'Брасс', 'FLY': 'Баттерфляй'}
+# Above reg.parallel.CHUNK_SIZE, so a parallel run has several chunks
+ROWS = 2500
+
+
+def write_meet(path: Path):
+    events = []
+    for gender in ('M', 'F'):
+        for stroke in STROKES:
+            for distance in (50, 100, 200):
+                eventid = len(events) + 1
+                events.append(Event(
+                    eventid=eventid, number=eventid, gender=gender,
+                    swimstyle=SwimStyle(distance=distance, relaycount=1, stroke=stroke),
+                    agegroups=[AgeGroup(id=eventid, agemin=-1, agemax=-1)],
+                ))
+    meet = Meet(name='Test', city='Town', nation='RUS', course='LCM', sessions=[
+        Session(date=datetime(2026, 5, 1), number=1, events=events)])
+    tofile(Lenex(
+        constructor=Constructor(name='test', version='1', registration='test',
+                                contact=Contact(email='test@example.com')),
+        meet=meet, version='3.0',
+    ), str(path))
+
+
+def write_sheet(path: Path, rows: int, bad: float):
+    """Entries of 2000 athletes; a ``bad`` share has an unknown stroke, a
+    distance the meet doesn't have or an unreadable time."""
+    rng = random.Random(0)
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.append(['Фамилия', 'Имя', 'Отчество', 'Дата рождения', 'Пол', '', '', 'Клуб',
+                  'Разряд', 'Стиль плавания', 'Дистанция', '', 'Заявочное время', 'Категория'])
+    for _ in range(rows):
+        k = rng.randrange(2000)
+        stroke = STROKES[rng.choice(list(STROKES))]
+        distance = rng.choice((50, 100, 200))
+        entrytime = f'{rng.randrange(3)}:{rng.randrange(60):02}.{rng.randrange(100):02}'
+        if rng.random() < bad:
+            kind = rng.randrange(3)
+            if kind == 0:
+                stroke = 'чепуха'
+            elif kind == 1:
+                distance = 400
+            else:
+                entrytime = 'garbage'
+        sheet.append([f'Фам{k}', f'Имя{k % 37}', f'Отч{k % 5}',
+                      f'{1 + k % 28:02}.{1 + k % 12:02}.{2008 + k % 10}',
+                      ('Мужской', 'Женский')[k % 2], None, None, f'Клуб {k % 13}', 'КМС',
+                      stroke, distance, None, entrytime, ''])
+    book.save(path)
+
+
+@pytest.fixture(scope='session')
+def meet_files(tmp_path_factory) -> tuple[str, str]:
+    """(lxf, xlsx) of a generated meet and its entries sheet."""
+    directory = tmp_path_factory.mktemp('meet')
+    write_meet(directory / 'meet.lef')
+    write_sheet(directory / 'sheet.xlsx', ROWS, bad=0.1)
+    return str(directory / 'meet.lef'), str(directory / 'sheet.xlsx')
+
+
+@pytest.fixture
+def config() -> dict:
+    config = json.loads((ROOT / 'config.json').read_text(encoding='utf-8'))
+    config.update(workers=1, cache={'enabled': False})
+    return config
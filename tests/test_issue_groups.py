@@ -0,0 +1,62 @@
+import random
+
+from reg.issue_groups import IssueGroup, IssueGroups
+
+
+def spans(rows: set[int]) -> list[list[int]]:
+    ranges = []
+    for i in sorted(rows):
+        if ranges and ranges[-1][1] == i - 1:
+            ranges[-1][1] = i
+        else:
+            ranges.append([i, i])
+    return ranges
+
+
+def test_add_row_merges_ranges():
+    group = IssueGroup('points_policy', '', {}, 'warning', '')
+    for i in (10, 11, 14, 3, 5, 4, 12, 20, 13, 1):
+        group._add_row(i)
+    assert group.ranges == [[1, 1], [3, 5], [10, 14], [20, 20]]
+    # Bridges two spans
+    group._add_row(2)
+    assert group.ranges == [[1, 5], [10, 14], [20, 20]]
+
+
+def test_rows_in_any_order():
+    rng = random.Random(1)
+    for _ in range(200):
+        rows = rng.sample(range(60), rng.randint(1, 40))
+        group = IssueGroup('points_policy', '', {}, 'warning', '')
+        for i in rows:
+            group._add_row(i)
+        assert group.ranges == spans(set(rows))
+        removed = set(rng.sample(rows, rng.randint(0, len(rows))))
+        for i in removed:
+            group._remove_row(i)
+        assert group.ranges == spans(set(rows) - removed)
+
+
+def test_names_stay_out_of_group_keys():
+    groups = IssueGroups()
+    names = ['Иван Петров', 'Анна Смирнова', 'Олег Козлов', 'Мария Орлова']
+    for i, name in enumerate(names):
+        groups.add('age_exh', f'{name} {20 + i}: статус EXH (возраст 10-12)',
+                   'warning', i, {'age': 20 + i, 'allowed': '10-12'})
+        groups.add('duplicate_entry', f'Дублированные записи: {name}, дистанция 7 (строки {i}, {i + 10})',
+                   'warning', None, {'eventid': 7, 'rows': [i, i + 10], 'kept': None})
+    groups.add('age_exh', 'Петр Сидоров 30: статус EXH (возраст 13-14)',
+               'warning', 9, {'age': 30, 'allowed': '13-14'})
+    # Issues without the template's fields keep the message template
+    groups.add('age_exh', 'The EXH is disabled and the age is not appropriate', 'error', 8, {})
+
+    assert {(g.category, g.label, tuple(g.key.items()), g.count) for g in groups} == {
+        ('age_exh', 'Статус EXH (возраст 10-12)', (('allowed', '10-12'),), 4),
+        ('age_exh', 'Петр Сидоров 30: статус EXH (возраст 13-14)', (('allowed', '13-14'),), 1),
+        ('age_exh', 'The EXH is disabled and the age is not appropriate', (('allowed', 'None'),), 1),
+        ('duplicate_entry', 'Дублированные записи, дистанция 7', (('eventid', '7'),), 4),
+    }
+
+    groups.remove('age_exh', 'Петр Сидоров 30: статус EXH (возраст 13-14)',
+                  'warning', 9, {'age': 30, 'allowed': '13-14'})
+    assert len(groups) == 3
@@ -0,0 +1,53 @@
+from itertools import product
+import json
+from pathlib import Path
+import re
+
+import pytest
+
+from reg.licenses import LicenseNormalizer
+
+CONFIG = json.loads((Path(__file__).resolve().parent.parent / 'config.json').read_text(encoding='utf-8'))
+
+
+def legacy_license(config: dict, license: str) -> str | None:
+    """AthleteParser.get_license before LicenseNormalizer."""
+    def chg(match: re.Match):
+        t = match.string[match.regs[0][0]:match.regs[0][1]]
+        return t.lower()
+    license = re.sub('[^I]{1}', chg, license)
+
+    for a, b in config['replacement'].items():
+        license = license.replace(a, b)
+    if license in config['licenses']:
+        return license
+
+
+def tokens() -> list[str]:
+    found = set(CONFIG['replacement']) | set(CONFIG['replacement'].values())
+    found |= set(CONFIG['licenses']) | {'Взрослый', 'Юношеский', 'Ю', 'КМС', 'I', 'V'}
+    return sorted(found - {''})
+
+
+@pytest.fixture
+def normalizer() -> LicenseNormalizer:
+    return LicenseNormalizer(CONFIG['replacement'], CONFIG['licenses'])
+
+
+@pytest.mark.parametrize('raw', ['1-взрослый', 'II-вз', '3-взр', 'Iвзразряд', '2 юн', 'III-юношеский', 'КМС', 'мс'])
+def test_known_values(normalizer: LicenseNormalizer, raw: str):
+    assert normalizer.get(raw) == legacy_license(CONFIG, raw)
+    assert normalizer.get(raw) is not None
+
+
+def test_matches_legacy_on_token_combinations(normalizer: LicenseNormalizer):
+    parts = tokens()
+    for n in (1, 2, 3):
+        for combination in product(parts, repeat=n):
+            raw = ''.join(combination)
+            assert normalizer.get(raw) == legacy_license(CONFIG, raw), raw
+
+
+def test_memoised(normalizer: LicenseNormalizer):
+    assert normalizer.get('1-взрослый') == normalizer.get('1-взрослый') == 'I'
+    assert normalizer.hits == 1
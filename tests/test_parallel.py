@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from lenexpy import tofile
+from loguru import logger
+
+from reg.main import TranslatorLenex
+
+
+def translate(meet_files: tuple[str, str], config: dict, output: Path) -> tuple[bytes, list, list]:
+    """Output file, issues and the log messages of one run."""
+    messages = []
+    sink = logger.add(lambda m: messages.append((m.record['level'].name, m.record['message'])),
+                      level='INFO', format='{message}')
+    try:
+        translator = TranslatorLenex(*meet_files, config)
+        tofile(translator.parse(), str(output))
+    finally:
+        logger.remove(sink)
+    issues = [(i.category, i.row_index, i.message) for i in translator.collector.items]
+    # Timings and the worker count differ between the runs, the base-time
+    # table is loaded once per process
+    messages = sorted(m for m in messages
+                      if not m[1].startswith(('[Stats]', 'Параллельная', '[BaseTime]')))
+    return output.read_bytes(), issues, messages
+
+
+def test_workers_match_sequential(meet_files, config, tmp_path):
+    # Unlimited, as the rate limit counts per process
+    config['logging'] = {'limit': 0}
+    sequential = translate(meet_files, dict(config, workers=1), tmp_path / 'sequential.lef')
+    parallel = translate(meet_files, dict(config, workers=2), tmp_path / 'parallel.lef')
+    assert parallel[0] == sequential[0]
+    assert parallel[1] == sequential[1]
+    # Worker messages come back to the parent's sinks
+    assert any(level == 'WARNING' for level, _ in sequential[2])
+    assert parallel[2] == sequential[2]
@@ -0,0 +1,35 @@
+import pytest
+from lenexpy import tofile
+
+from reg.main import TranslatorLenex
+
+POLICIES = [
+    ({'enabled': True, 'min': 300.0, 'max': 700.0}, {'min': 100.0}),
+    ({'enabled': True, 'min': 300.0, 'max': 700.0}, {'max': 900.0}),
+    ({'enabled': True, 'min': 300.0, 'max': 700.0}, {'enabled': False}),
+    ({'enabled': False, 'min': 300.0, 'max': 700.0}, {'enabled': True, 'min': 500.0}),
+]
+
+
+def result(translator: TranslatorLenex, path) -> tuple[bytes, list, dict]:
+    tofile(translator.lenex, str(path))
+    issues = sorted((i.category, i.row_index or 0, i.level, i.message)
+                    for i in translator.collector.items)
+    groups = {(g.category, g.template, tuple(g.key.items())): (g.count, g.ranges)
+              for g in translator.collector.groups}
+    return path.read_bytes(), issues, groups
+
+
+@pytest.mark.parametrize('spill_after', [1_000_000, 100])
+@pytest.mark.parametrize('start, change', POLICIES)
+def test_reapply_matches_full_run(meet_files, config, tmp_path, start, change, spill_after):
+    config['issues'] = {'spill_after': spill_after}
+    config['points'] = dict(start)
+    translator = TranslatorLenex(*meet_files, config)
+    translator.parse()
+    config['points'].update(change)
+    assert translator.reapply_points()
+
+    full = TranslatorLenex(*meet_files, dict(config, points=dict(config['points'])))
+    full.parse()
+    assert result(translator, tmp_path / 'reapplied.lef') == result(full, tmp_path / 'full.lef')